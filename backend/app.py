@@ -1,26 +1,46 @@
 import os
-import sys
 import logging
 import secrets
 from logging.handlers import RotatingFileHandler
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify, request, send_file, send_from_directory
 from dotenv import load_dotenv
-import joblib
 
 # Import extensions and models
 try:
     from .extensions import db, cors, limiter
-    from .models import Admin
+    from .models import Admin, ensure_indexes
+    from .cache import TTLCache, build_cache
+    from . import utils as utils_module
+    from . import password_hasher
+    from .password_hasher import PasswordHasher, PasswordHasherBusy
+    from .model_registry import ModelRegistry
+    from .inference_scheduler import InferenceScheduler
+    from .history_writer import HistoryWriter
     from .routes.auth import auth_bp
     from .routes.profile import profile_bp
-    from .routes.prediction import prediction_bp, prediction_bp as pred_module
+    from .routes.prediction import prediction_bp
+    from .routes import prediction as pred_module
+    from .routes import profile as profile_module
+    from .media_store import MediaStore
+    from .static_assets import AssetIndex, IMMUTABLE_MAX_AGE
     from .routes.admin import admin_bp
 except (ImportError, ValueError):
     from extensions import db, cors, limiter
-    from models import Admin
+    from models import Admin, ensure_indexes
+    from cache import TTLCache, build_cache
+    import utils as utils_module
+    import password_hasher
+    from password_hasher import PasswordHasher, PasswordHasherBusy
+    from model_registry import ModelRegistry
+    from inference_scheduler import InferenceScheduler
+    from history_writer import HistoryWriter
     from routes.auth import auth_bp
     from routes.profile import profile_bp
-    from routes.prediction import prediction_bp, prediction_bp as pred_module
+    from routes.prediction import prediction_bp
+    from routes import prediction as pred_module
+    from routes import profile as profile_module
+    from media_store import MediaStore
+    from static_assets import AssetIndex, IMMUTABLE_MAX_AGE
     from routes.admin import admin_bp
 
 load_dotenv()
@@ -36,6 +56,32 @@ def create_app():
     app.config['REFRESH_TOKEN_EXPIRES'] = int(os.getenv('REFRESH_TOKEN_EXPIRES_SECONDS', 1209600))
     app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../frontend/uploads')
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    # Let a fronting nginx/Apache send static files (X-Sendfile); otherwise the WSGI server's sendfile() is used
+    app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() in ('1', 'true', 'yes')
+    app.config['UPLOAD_MAX_BYTES'] = int(os.getenv('UPLOAD_MAX_BYTES', 5 * 1024 * 1024))
+    app.config['THUMBNAIL_SIZE'] = int(os.getenv('THUMBNAIL_SIZE', 256))
+    app.config['THUMBNAIL_WORKERS'] = int(os.getenv('THUMBNAIL_WORKERS', 2))
+    # Shared across worker processes on this host; memory:// keeps per-process counters
+    app.config['RATELIMIT_STORAGE_URI'] = os.getenv('RATELIMIT_STORAGE_URI', os.getenv('RATELIMIT_STORAGE_URL', 'sqlite:///logs/ratelimit.db'))
+    app.config['RATELIMIT_STRATEGY'] = os.getenv('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    app.config['PREDICTION_CACHE_URL'] = os.getenv('PREDICTION_CACHE_URL')
+    app.config['PREDICTION_CACHE_SIZE'] = int(os.getenv('PREDICTION_CACHE_SIZE', 4096))
+    app.config['PREDICTION_CACHE_TTL'] = int(os.getenv('PREDICTION_CACHE_TTL', 600))
+    app.config['BCRYPT_ROUNDS'] = int(os.getenv('BCRYPT_ROUNDS', 12))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_QUEUE_SIZE'] = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 64))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    app.config['PRINCIPAL_CACHE_SIZE'] = int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000))
+    app.config['PRINCIPAL_CACHE_TTL'] = float(os.getenv('PRINCIPAL_CACHE_TTL', 30))
+    app.config['MODEL_WATCH_INTERVAL'] = float(os.getenv('MODEL_WATCH_INTERVAL', 0))
+    app.config['INFERENCE_BATCH_WINDOW_MS'] = float(os.getenv('INFERENCE_BATCH_WINDOW_MS', 0))
+    app.config['INFERENCE_MAX_BATCH'] = int(os.getenv('INFERENCE_MAX_BATCH', 32))
+    app.config['HISTORY_WRITE_BEHIND'] = os.getenv('HISTORY_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+    app.config['HISTORY_QUEUE_SIZE'] = int(os.getenv('HISTORY_QUEUE_SIZE', 10000))
+    app.config['HISTORY_FLUSH_SIZE'] = int(os.getenv('HISTORY_FLUSH_SIZE', 200))
+    app.config['HISTORY_FLUSH_INTERVAL'] = float(os.getenv('HISTORY_FLUSH_INTERVAL', 1.0))
+    app.config['HISTORY_SPILL_PATH'] = os.getenv('HISTORY_SPILL_PATH', 'logs/history_spill.ndjson')
+    app.config['HISTORY_DEAD_LETTER_PATH'] = os.getenv('HISTORY_DEAD_LETTER_PATH', 'logs/history_dead_letter.ndjson')
 
     # Initialize extensions
     db.init_app(app)
@@ -55,53 +101,102 @@ def create_app():
     app.register_blueprint(prediction_bp)
     app.register_blueprint(admin_bp)
 
+    # Prediction cache (in-process by default, shared when PREDICTION_CACHE_URL points at Redis)
+    pred_module.PREDICTION_CACHE = build_cache(app.config['PREDICTION_CACHE_URL'], app.config['PREDICTION_CACHE_SIZE'], app.config['PREDICTION_CACHE_TTL'])
+
+    # Content-addressed profile pictures; thumbnails are rendered off the request thread
+    profile_module.MEDIA_STORE = MediaStore(app.config['UPLOAD_FOLDER'], max_bytes=app.config['UPLOAD_MAX_BYTES'], thumbnail_size=app.config['THUMBNAIL_SIZE'], workers=app.config['THUMBNAIL_WORKERS'])
+
+    # bcrypt runs on its own bounded pool so login bursts cannot take every worker's CPU
+    password_hasher.PASSWORD_HASHER = PasswordHasher(rounds=app.config['BCRYPT_ROUNDS'], workers=app.config['PASSWORD_HASH_WORKERS'], max_queue=app.config['PASSWORD_HASH_QUEUE_SIZE'], timeout=app.config['PASSWORD_HASH_TIMEOUT'])
+
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(e):
+        app.logger.warning(f"⚠️ {e}")
+        return jsonify({"message": "Server is busy, please try again shortly"}), 503, {"Retry-After": "1"}
+
+    # Authenticated user/admin rows, so login_required skips the per-request SELECT (0 disables)
+    utils_module.PRINCIPAL_CACHE = TTLCache(maxsize=app.config['PRINCIPAL_CACHE_SIZE'], ttl=app.config['PRINCIPAL_CACHE_TTL'])
+
     # Load ML models
     load_ml_models(app)
 
+    # Opt-in micro-batching of concurrent /api/predict-job requests
+    if app.config['INFERENCE_BATCH_WINDOW_MS'] > 0:
+        pred_module.INFERENCE_SCHEDULER = InferenceScheduler(pred_module.predict_profiles, max_batch=app.config['INFERENCE_MAX_BATCH'], max_wait_ms=app.config['INFERENCE_BATCH_WINDOW_MS'])
+
+    # Opt-in write-behind queue for PredictionHistory inserts
+    if app.config['HISTORY_WRITE_BEHIND']:
+        pred_module.HISTORY_WRITER = HistoryWriter(app, max_queue=app.config['HISTORY_QUEUE_SIZE'], flush_size=app.config['HISTORY_FLUSH_SIZE'], flush_interval=app.config['HISTORY_FLUSH_INTERVAL'], spill_path=app.config['HISTORY_SPILL_PATH'], dead_letter_path=app.config['HISTORY_DEAD_LETTER_PATH'])
+
+    # Warm the /api/get-options index
+    try:
+        pred_module.load_options_payload(app)
+    except Exception as e:
+        app.logger.warning(f"⚠️ Options index not built at startup: {e}")
+
     # Database setup
     with app.app_context():
         db.create_all()
+        ensure_indexes()
         if not Admin.query.filter_by(username='admin').first():
             db.session.add(Admin('admin', 'admin123'))
             db.session.commit()
 
-    # Base routes
+    # Base routes; files built by static_assets.py are served from frontend/dist
+    assets = AssetIndex(os.path.join(app.static_folder, 'dist'))
+
+    def send_frontend(filename):
+        asset = assets.lookup(filename, request.accept_encodings)
+        if asset is None:
+            return send_from_directory('../frontend', filename)
+        path, mimetype, encoding, etag, immutable = asset
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        if immutable:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
     @app.route('/')
     def index():
-        return send_from_directory('../frontend', 'login.html')
+        return send_frontend('login.html')
 
     @app.route('/<path:filename>')
     def serve_static(filename):
-        return send_from_directory('../frontend', filename)
+        return send_frontend(filename)
 
     @app.route('/health')
     def health():
-        return jsonify({"status": "healthy", "ml_loaded": pred_module.ML_MODEL is not None}), 200
+        bundle = pred_module.active_bundle()
+        return jsonify({"status": "healthy", "ml_loaded": bundle is not None, "model_version": bundle.version if bundle else None}), 200
 
     return app
 
 def load_ml_models(app):
-    try:
-        model_dir = os.path.join(os.path.dirname(__file__), 'models')
-        model_path = os.path.join(model_dir, 'best_model.pkl')
-        preprocessor_path = os.path.join(model_dir, 'preprocessor.pkl')
-        
-        if os.path.exists(model_path) and os.path.exists(preprocessor_path):
-            # Add ml directory to path for custom preprocessor
-            ml_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ml')
-            if os.path.exists(ml_dir):
-                sys.path.insert(0, ml_dir)
-                from preprocess import Edu2JobPreprocessor
-                import __main__
-                __main__.Edu2JobPreprocessor = Edu2JobPreprocessor
-            
-            pred_module.ML_MODEL = joblib.load(model_path)
-            pred_module.ML_PREPROCESSOR = joblib.load(preprocessor_path)
-            app.logger.info("✅ ML models loaded successfully")
-        else:
-            app.logger.warning("⚠️ ML model files not found in backend/models/")
-    except Exception as e:
-        app.logger.error(f"❌ Error loading models: {e}")
+    """Create the model registry, load the current model synchronously and start the optional file watch."""
+    model_dir = os.path.join(os.path.dirname(__file__), 'models')
+    ml_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ml')
+
+    def on_swap(bundle, previous):
+        # Results from the previous model must not be served for the new one
+        if pred_module.PREDICTION_CACHE is not None:
+            pred_module.PREDICTION_CACHE.clear()
+
+    registry = ModelRegistry(model_dir, ml_dir, logger=app.logger, on_swap=on_swap)
+    pred_module.MODEL_REGISTRY = registry
+    if registry.fingerprint() is None:
+        app.logger.warning("⚠️ ML model files not found in backend/models/")
+    else:
+        registry.reload(wait=True)
+    registry.start_watcher(app.config['MODEL_WATCH_INTERVAL'])
+    return registry
 
 app = create_app()
 
@@ -0,0 +1,146 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with a size bound, per-entry TTL and hit/miss counters."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class RedisCache:
+    """Shared cache backend for multi-worker deployments; values are stored as JSON with a TTL.
+
+    Redis errors are logged and never raised: a failed lookup counts as a miss
+    and a failed write or delete is skipped, so an outage only costs cache hits.
+    """
+
+    def __init__(self, url, ttl=300, prefix='edu2job:'):
+        import redis  # optional dependency, only needed when a redis:// URL is configured
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._redis_errors = (redis.RedisError, ValueError)
+        self._lock = threading.Lock()
+
+    def _failed(self, operation, error):
+        with self._lock:
+            self.errors += 1
+        logger.warning(f"⚠️ Shared cache {operation} failed: {error!r}")
+
+    def get(self, key, default=None):
+        try:
+            raw = self.client.get(self.prefix + key)
+            value = json.loads(raw) if raw is not None else None
+        except self._redis_errors as e:
+            self._failed('get', e)
+            raw = None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+        except self._redis_errors as e:
+            self._failed('set', e)
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except self._redis_errors as e:
+            self._failed('delete', e)
+
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=self.prefix + '*'):
+                self.client.delete(key)
+        except self._redis_errors as e:
+            self._failed('clear', e)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "redis",
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def build_cache(url=None, maxsize=1024, ttl=300, prefix='edu2job:'):
+    """Return a RedisCache for redis:// URLs, falling back to an in-process TTLCache."""
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            cache = RedisCache(url, ttl=ttl, prefix=prefix)
+            cache.client.ping()
+            return cache
+        except Exception as e:
+            logger.warning(f"⚠️ Shared cache unavailable ({e}), using in-process cache")
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -3,6 +3,12 @@ from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+# Registers the sqlite:// rate limit storage scheme (RATELIMIT_STORAGE_URI)
+try:
+    from . import ratelimit_storage
+except (ImportError, ValueError):
+    import ratelimit_storage
+
 db = SQLAlchemy()
 cors = CORS()
 limiter = Limiter(get_remote_address, default_limits=["2000 per day", "500 per hour"])
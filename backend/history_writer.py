@@ -0,0 +1,274 @@
+import os
+import glob
+import json
+import time
+import queue
+import atexit
+import logging
+import datetime
+import threading
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError, InterfaceError
+
+try:
+    from .extensions import db
+    from .models import PredictionHistory, utcnow
+    from .metrics import Histogram
+except (ImportError, ValueError):
+    from extensions import db
+    from models import PredictionHistory, utcnow
+    from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the database is unreachable or busy rather than that a row is bad
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+class HistoryWriter:
+    """
+    Write-behind queue for PredictionHistory rows. Requests enqueue plain row
+    dicts; a background thread inserts them with multi-row INSERTs once
+    flush_size rows are waiting or flush_interval seconds have passed. When
+    the queue stays full (database slower than traffic) rows are appended to
+    an NDJSON spill file, which is replayed after the next successful flush.
+    When a multi-row INSERT is rejected, its rows are retried one by one and
+    only the rows the database still refuses (e.g. a deleted user's id) go
+    to a dead-letter file, so one bad row cannot hold back the rest.
+    Everything still queued is flushed at interpreter exit.
+    """
+
+    def __init__(self, app, max_queue=10000, flush_size=200, flush_interval=1.0, put_timeout=0.05, spill_path='logs/history_spill.ndjson', dead_letter_path='logs/history_dead_letter.ndjson'):
+        self.app = app
+        self.flush_size = int(flush_size)
+        self.flush_interval = float(flush_interval)
+        self.put_timeout = float(put_timeout)
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self.failed_flushes = 0
+        self.flush_rows = Histogram([1, 10, 50, 100, 200, 500, 1000])
+        self.flush_ms = Histogram([1, 5, 10, 25, 50, 100, 250, 1000, 5000])
+        self._recover_replays()
+        atexit.register(self.close)
+
+    def _ensure_worker(self):
+        # Started on first use so forked workers each get their own thread
+        if self._worker is None or not self._worker.is_alive():
+            with self._start_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='history-writer', daemon=True)
+                    self._worker.start()
+
+    def submit(self, row):
+        """Queue one row; blocks up to put_timeout when full, then spills it to disk."""
+        self.submit_many([row])
+
+    def submit_many(self, rows):
+        self._ensure_worker()
+        overflow = []
+        for row in rows:
+            # Timestamp the prediction, not the (later) insert
+            row.setdefault('created_at', utcnow())
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+            except queue.Full:
+                overflow.append(row)
+        if overflow:
+            self._spill(overflow)
+
+    def _drain(self, limit):
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                rows = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.flush_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=min(remaining, 0.05)))
+                except queue.Empty:
+                    continue
+                rows.extend(self._drain(self.flush_size - len(rows)))
+            self._write(rows)
+
+    def _insert(self, rows):
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(PredictionHistory), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _insert_batch(self, rows):
+        """
+        Insert rows with one multi-row INSERT, falling back to one row at a
+        time when the batch is rejected for its content.
+
+        Args:
+            rows: Row dicts for PredictionHistory
+
+        Returns:
+            Number of rows written; rows the database refuses are dead-lettered
+
+        Raises:
+            One of TRANSIENT_ERRORS when the database is unavailable. If it
+            happens during the row-by-row retry, the error carries `written`
+            and the `pending_rows` still to be inserted.
+        """
+        try:
+            self._insert(rows)
+            return len(rows)
+        except TRANSIENT_ERRORS:
+            raise
+        except Exception as e:
+            if len(rows) == 1:
+                self._dead_letter(rows, e)
+                return 0
+            logger.warning(f"History insert of {len(rows)} rows rejected ({e}), retrying row by row")
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                self._insert([row])
+                written += 1
+            except TRANSIENT_ERRORS as e:
+                e.written, e.pending_rows = written, rows[index:]
+                raise
+            except Exception as e:
+                self._dead_letter([row], e)
+        return written
+
+    def _write(self, rows):
+        with self._flush_lock:
+            started = time.perf_counter()
+            try:
+                written = self._insert_batch(rows)
+            except Exception as e:
+                pending = getattr(e, 'pending_rows', rows)
+                self.written += getattr(e, 'written', 0)
+                self.failed_flushes += 1
+                logger.error(f"History flush of {len(rows)} rows failed, spilling {len(pending)} to {self.spill_path}: {e}")
+                self._spill(pending)
+                return False
+            self.written += written
+            self.flush_rows.observe(len(rows))
+            self.flush_ms.observe((time.perf_counter() - started) * 1000)
+            self._replay_spill()
+            return True
+
+    @staticmethod
+    def _serialize(row, **extra):
+        return json.dumps({**row, 'created_at': row['created_at'].isoformat(), **extra}) + '\n'
+
+    def _append_spill(self, rows):
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+            with open(self.spill_path, 'a') as f:
+                f.writelines(self._serialize(row) for row in rows)
+
+    def _spill(self, rows):
+        self._append_spill(rows)
+        with self._spill_lock:
+            self.spilled += len(rows)
+
+    def _dead_letter(self, rows, error):
+        """Set aside rows the database will never accept, with the error, for manual inspection."""
+        logger.error(f"Dead-lettering {len(rows)} history row(s) to {self.dead_letter_path}: {error}")
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or '.', exist_ok=True)
+            with open(self.dead_letter_path, 'a') as f:
+                f.writelines(self._serialize(row, error=str(error).splitlines()[0]) for row in rows)
+            self.dead_lettered += len(rows)
+
+    def _recover_replays(self):
+        """Return rows from replays interrupted by a dead process to the spill file."""
+        for path in glob.glob(self.spill_path + '.*.replay'):
+            try:
+                pid = int(path.rsplit('.', 2)[-2])
+                os.kill(pid, 0)
+                continue
+            except (ValueError, ProcessLookupError):
+                pass
+            except PermissionError:
+                continue
+            with self._spill_lock, open(path) as src, open(self.spill_path, 'a') as dst:
+                dst.writelines(line for line in src if line.strip())
+            os.remove(path)
+
+    def _replay_spill(self):
+        """Insert rows spilled earlier; called with the flush lock held after a successful flush."""
+        replay_path = f"{self.spill_path}.{os.getpid()}.replay"
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return
+            os.replace(self.spill_path, replay_path)
+        with open(replay_path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            row['created_at'] = datetime.datetime.fromisoformat(row['created_at'])
+        done = 0
+        try:
+            while done < len(rows):
+                batch = rows[done:done + self.flush_size]
+                self.replayed += self._insert_batch(batch)
+                done += len(batch)
+        except Exception as e:
+            pending = getattr(e, 'pending_rows', rows[done:done + self.flush_size]) + rows[done + self.flush_size:]
+            self.replayed += getattr(e, 'written', 0)
+            logger.error(f"History spill replay failed, keeping {len(pending)} rows in {self.spill_path}: {e}")
+            self._append_spill(pending)
+        os.remove(replay_path)
+
+    def flush(self):
+        """Synchronously write everything queued (and any spill file) to the database."""
+        while True:
+            rows = self._drain(self.flush_size)
+            if not rows:
+                break
+            self._write(rows)
+        with self._flush_lock:
+            self._replay_spill()
+
+    def close(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 1)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"History flush at shutdown failed: {e}")
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+            "failed_flushes": self.failed_flushes,
+            "spill_pending": os.path.exists(self.spill_path),
+            "flush_rows": self.flush_rows.snapshot(),
+            "flush_ms": self.flush_ms.snapshot()
+        }
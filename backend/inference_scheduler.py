@@ -0,0 +1,114 @@
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+
+try:
+    from .metrics import Histogram
+except (ImportError, ValueError):
+    from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_Pending = namedtuple('_Pending', ['profile', 'bundle', 'future', 'enqueued'])
+
+
+class InferenceScheduler:
+    """
+    Opt-in micro-batcher for single predict requests. Requests arriving within
+    max_wait_ms of the first queued one (up to max_batch) are scored together
+    with one call to score_batch(profiles, bundle), and each caller gets its
+    own result back.
+    """
+
+    def __init__(self, score_batch, max_batch=32, max_wait_ms=2.0, max_queue=1024, timeout=5.0):
+        self.score_batch = score_batch
+        self.max_batch = int(max_batch)
+        self.max_wait = float(max_wait_ms) / 1000.0
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.wait_ms = Histogram([0.25, 0.5, 1, 2, 5, 10, 25, 50, 100])
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024])
+        self.rejected = 0
+        self.failed_batches = 0
+
+    def _ensure_worker(self):
+        # Started on first use so forked workers (e.g. gunicorn --preload) each get their own thread
+        if self._worker is None or not self._worker.is_alive():
+            with self._start_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+                    self._worker.start()
+
+    def submit(self, profile, bundle):
+        """
+        Queue one profile and block until its batch has been scored.
+        Raises queue.Full when the queue is saturated and TimeoutError when
+        the result does not arrive in time; callers then score inline.
+        """
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put_nowait(_Pending(profile, bundle, future, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise
+        return future.result(timeout=self.timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self.queue_depth.observe(self._queue.qsize())
+            self.batch_size.observe(len(batch))
+            for item in batch:
+                self.wait_ms.observe((started - item.enqueued) * 1000)
+
+            # A model swap can land mid-window; never score a request with another request's model
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item.bundle), []).append(item)
+            for items in groups.values():
+                try:
+                    results = self.score_batch([item.profile for item in items], items[0].bundle)
+                    for item, result in zip(items, results):
+                        item.future.set_result(result)
+                except Exception as e:
+                    with self._lock:
+                        self.failed_batches += 1
+                    logger.error(f"Inference batch of {len(items)} failed: {e}")
+                    for item in items:
+                        item.future.set_exception(e)
+
+    def stats(self):
+        with self._lock:
+            rejected, failed_batches = self.rejected, self.failed_batches
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth_now": self._queue.qsize(),
+            "rejected": rejected,
+            "failed_batches": failed_batches,
+            "batch_size": self.batch_size.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+            "queue_depth": self.queue_depth.snapshot()
+        }
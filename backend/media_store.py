@@ -0,0 +1,202 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image  # optional dependency, only needed for thumbnails
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+INCOMING_DIR = '.incoming'
+
+
+class UnsupportedImage(ValueError):
+    pass
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def sniff_image_type(head):
+    """File extension for PNG/JPEG/GIF/WebP magic bytes, or None."""
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+class HashingWriter:
+    """Writable temp file that hashes and size-checks every chunk as it is written."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.head = b''
+        self.sha256 = hashlib.sha256()
+        self._file = open(path, 'w+b')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise ImageTooLarge(f"Image exceeds {self.max_bytes} bytes")
+        if len(self.head) < 16:
+            self.head += data[:16 - len(self.head)]
+        self.sha256.update(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class MediaStore:
+    """
+    Content-addressed image storage under the upload folder. Files are named
+    by the SHA-256 of their bytes, so identical uploads are stored once;
+    thumbnails are rendered on a small thread pool after the request has
+    stored the original.
+    """
+
+    def __init__(self, root, max_bytes=5 * 1024 * 1024, thumbnail_size=256, workers=2, gc_grace=60):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.thumbnail_size = int(thumbnail_size)
+        self.gc_grace = float(gc_grace)
+        self._deferred = set()
+        self._deferred_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix='thumbnailer') if Image is not None else None
+        os.makedirs(os.path.join(root, INCOMING_DIR), exist_ok=True)
+
+    def path(self, filename):
+        if not filename or os.path.basename(filename) != filename:
+            raise ValueError(f"Invalid media filename: {filename!r}")
+        return os.path.join(self.root, filename)
+
+    def open_temp(self):
+        return HashingWriter(os.path.join(self.root, INCOMING_DIR, f"{uuid.uuid4().hex}.part"), self.max_bytes)
+
+    def discard(self, writer):
+        writer.close()
+        try:
+            os.remove(writer.path)
+        except FileNotFoundError:
+            pass
+
+    def store(self, writer):
+        """Move a finished upload to <sha256>.<ext>; returns the filename. The temp file is always consumed."""
+        writer.close()
+        ext = sniff_image_type(writer.head)
+        if ext is None:
+            self.discard(writer)
+            raise UnsupportedImage("Only PNG, JPEG, GIF and WebP images are supported")
+        filename = f"{writer.sha256.hexdigest()}.{ext}"
+        target = self.path(filename)
+        if os.path.exists(target):
+            # Duplicate content: keep the stored copy, and touch it so a concurrent collect() leaves it alone
+            os.utime(target)
+            self.discard(writer)
+        else:
+            os.replace(writer.path, target)
+            # Backdate new files past the grace period: only a dedupe hit above should protect a file from collect()
+            stamp = time.time() - self.gc_grace
+            os.utime(target, (stamp, stamp))
+        self.schedule_thumbnail(filename)
+        return filename
+
+    def save_bytes(self, data):
+        writer = self.open_temp()
+        try:
+            writer.write(data)
+        except ImageTooLarge:
+            self.discard(writer)
+            raise
+        return self.store(writer)
+
+    def thumbnail_name(self, filename):
+        stem, ext = os.path.splitext(filename)
+        return f"{stem}_thumb{ext}"
+
+    def thumbnail_for(self, filename):
+        """The thumbnail's filename once it has been rendered, else None."""
+        if not filename:
+            return None
+        thumbnail = self.thumbnail_name(filename)
+        return thumbnail if os.path.exists(os.path.join(self.root, thumbnail)) else None
+
+    def schedule_thumbnail(self, filename):
+        if self._executor is None or os.path.exists(self.path(self.thumbnail_name(filename))):
+            return None
+        return self._executor.submit(self._render_thumbnail, filename)
+
+    def _render_thumbnail(self, filename):
+        target = self.path(self.thumbnail_name(filename))
+        tmp = os.path.join(self.root, INCOMING_DIR, f"{uuid.uuid4().hex}.thumb")
+        try:
+            with Image.open(self.path(filename)) as image:
+                fmt = image.format
+                image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+                if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                image.save(tmp, format=fmt)
+            os.replace(tmp, target)
+            return self.thumbnail_name(filename)
+        except Exception as e:
+            logger.warning(f"⚠️ Thumbnail for {filename} failed: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return None
+
+    def collect(self, filename, is_unreferenced=None):
+        """
+        Delete an image (and its thumbnail) the caller has found unreferenced.
+        Files re-uploaded within gc_grace seconds are kept for now, since that
+        upload may be about to reference them; when `is_unreferenced` is
+        given, it is called again once the grace period has passed and the
+        file is deleted then if it still returns True.
+        """
+        try:
+            target = self.path(filename)
+            age = time.time() - os.path.getmtime(target)
+        except (ValueError, FileNotFoundError):
+            return False
+        if age < self.gc_grace:
+            if is_unreferenced is not None:
+                self._defer_collect(filename, is_unreferenced, self.gc_grace - age)
+            return False
+        for path in (target, self.path(self.thumbnail_name(filename))):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def _defer_collect(self, filename, is_unreferenced, delay):
+        with self._deferred_lock:
+            if filename in self._deferred:
+                return
+            self._deferred.add(filename)
+
+        def recheck():
+            with self._deferred_lock:
+                self._deferred.discard(filename)
+            try:
+                if is_unreferenced():
+                    self.collect(filename, is_unreferenced)
+            except Exception as e:
+                logger.warning(f"⚠️ Deferred cleanup of {filename} failed: {e}")
+
+        timer = threading.Timer(delay, recheck)
+        timer.daemon = True
+        timer.start()
@@ -0,0 +1,34 @@
+import threading
+from bisect import bisect_left
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram; buckets are upper bounds, with an implicit +Inf bucket."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def snapshot(self):
+        with self._lock:
+            buckets = [{"le": bound, "count": count} for bound, count in zip(self.buckets, self._counts)]
+            buckets.append({"le": "+Inf", "count": self._counts[-1]})
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 4),
+                "mean": round(self._sum / self._count, 4) if self._count else 0.0,
+                "max": self._max,
+                "buckets": buckets
+            }
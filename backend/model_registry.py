@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+MODEL_FILE = 'best_model.pkl'
+PREPROCESSOR_FILE = 'preprocessor.pkl'
+INFO_FILE = 'model_info.json'
+# Pickle-free export written by ml/model_artifacts.py; preferred when present and up to date
+ARTIFACTS_MANIFEST = os.path.join('artifacts', 'manifest.json')
+
+# Profile used to validate a freshly loaded model before it is swapped in
+WARMUP_RECORD = {'Degree': 'B.Tech', 'Major': 'Computer Science', 'Specialization': 'Machine Learning', 'CGPA': 8.5, 'Skills': 'Python, Machine Learning, SQL', 'Certification': 'AWS Certified', 'Years of Experience': 2, 'Preferred Industry': 'Tech'}
+
+# Immutable snapshot of everything a request needs; swapped as a whole
+ModelBundle = namedtuple('ModelBundle', ['model', 'preprocessor', 'plan', 'version', 'cache_token', 'info', 'fingerprint', 'loaded_at', 'source'])
+
+
+class ModelRegistry:
+    """Holds the active ModelBundle and replaces it atomically after a background load and warm-up check."""
+
+    def __init__(self, model_dir, ml_dir=None, logger=None, on_swap=None):
+        self.model_dir = model_dir
+        self.ml_dir = ml_dir
+        self.logger = logger or logging.getLogger(__name__)
+        self.on_swap = on_swap
+        self._active = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self.last_error = None
+        self.reload_count = 0
+
+    @property
+    def active(self):
+        return self._active
+
+    def path(self, filename):
+        return os.path.join(self.model_dir, filename)
+
+    def _stat(self, filename):
+        try:
+            st = os.stat(self.path(filename))
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def fingerprint(self):
+        """(mtime_ns, size) of the model files; None when neither pickles nor artifacts are complete."""
+        stats = tuple(self._stat(filename) for filename in (MODEL_FILE, PREPROCESSOR_FILE, INFO_FILE, ARTIFACTS_MANIFEST))
+        if stats[3] is None and (stats[0] is None or stats[1] is None):
+            return None
+        return stats
+
+    def use_artifacts(self):
+        """True when an artifact export exists and is not older than the pickles it was made from."""
+        manifest = self._stat(ARTIFACTS_MANIFEST)
+        if manifest is None:
+            return False
+        pickles = [stat for stat in (self._stat(MODEL_FILE), self._stat(PREPROCESSOR_FILE)) if stat is not None]
+        if any(stat[0] > manifest[0] for stat in pickles):
+            self.logger.warning("⚠️ Model artifacts are older than the pickles, loading pickles (re-run ml/model_artifacts.py)")
+            return False
+        return True
+
+    def _import_ml(self):
+        if self.ml_dir and os.path.exists(self.ml_dir):
+            if self.ml_dir not in sys.path:
+                sys.path.insert(0, self.ml_dir)
+            import preprocess
+            if not getattr(self, '_import_logged', False):
+                self._import_logged = True
+                self.logger.info(f"⏱️ ml/preprocess imported in {preprocess.IMPORT_TIME_SECONDS * 1000:.0f} ms")
+            return preprocess
+
+    def _load_pickles(self):
+        # Pickles reference the class as __main__.Edu2JobPreprocessor
+        from preprocess import Edu2JobPreprocessor
+        import __main__
+        __main__.Edu2JobPreprocessor = Edu2JobPreprocessor
+        model = joblib.load(self.path(MODEL_FILE))
+        preprocessor = joblib.load(self.path(PREPROCESSOR_FILE))
+        info = {}
+        if os.path.exists(self.path(INFO_FILE)):
+            with open(self.path(INFO_FILE)) as f:
+                info = json.load(f)
+        return model, preprocessor, info
+
+    def load_bundle(self):
+        """Load and validate a bundle from disk without touching the active one."""
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            raise FileNotFoundError(f"ML model files not found in {self.model_dir}")
+        self._import_ml()
+        if self.use_artifacts():
+            from model_artifacts import load_artifacts
+            model, preprocessor, info = load_artifacts(os.path.dirname(self.path(ARTIFACTS_MANIFEST)))
+            source = 'artifacts'
+        else:
+            model, preprocessor, info = self._load_pickles()
+            source = 'pickle'
+        try:
+            plan = preprocessor.compile_inference_plan(model)
+        except Exception as e:
+            plan = None
+            self.logger.warning(f"⚠️ Inference plan unavailable, using DataFrame path: {e}")
+
+        plan = self.warm_up(model, preprocessor, plan)
+        version = str(info.get('version') or info.get('train_date') or 'unversioned')
+        cache_token = hashlib.sha1(repr((version, fingerprint)).encode('utf-8')).hexdigest()[:12]
+        return ModelBundle(model, preprocessor, plan, version, cache_token, info, fingerprint, time.time(), source)
+
+    def warm_up(self, model, preprocessor, plan=None):
+        """
+        Run one prediction through the DataFrame path and the inference plan.
+        Raises if the model output is unusable; returns the plan, or None if
+        it disagrees with the DataFrame path.
+        """
+        n_classes = len(preprocessor.label_encoders['Job Role'].classes_)
+        probs = model.predict_proba(preprocessor.transform(pd.DataFrame([WARMUP_RECORD]), is_training=False))[0]
+        if probs.shape != (n_classes,) or not np.all(np.isfinite(probs)) or abs(probs.sum() - 1) > 1e-6:
+            raise ValueError(f"Warm-up prediction failed validation (shape {probs.shape}, expected {n_classes} classes)")
+        if plan is not None and np.abs(plan.predict_proba(WARMUP_RECORD) - probs).max() > 1e-6:
+            self.logger.warning("⚠️ Inference plan disagrees with DataFrame path, using DataFrame path")
+            plan = None
+        return plan
+
+    def reload(self, wait=False):
+        """
+        Load the files on disk and swap them in. Runs in a background thread
+        unless wait=True. Returns False if a reload is already in progress;
+        with wait=True, returns True only when a new bundle became active.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        if wait:
+            return self._reload()
+        threading.Thread(target=self._reload, name='model-reload', daemon=True).start()
+        return True
+
+    def _reload(self):
+        try:
+            started = time.perf_counter()
+            bundle = self.load_bundle()
+            previous, self._active = self._active, bundle
+            self.last_error = None
+            self.reload_count += 1
+            self.logger.info(f"✅ ML model {bundle.version} active from {bundle.source} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+            if self.on_swap:
+                self.on_swap(bundle, previous)
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            self.logger.error(f"❌ Error loading models: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+
+    def start_watcher(self, interval):
+        """Poll the model files every `interval` seconds and reload once a change has settled."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def watch():
+            pending = failed = None
+            while True:
+                time.sleep(interval)
+                current = self.fingerprint()
+                active = self._active
+                if current is None or current == failed or (active is not None and current == active.fingerprint):
+                    pending = None
+                    continue
+                # Wait for one unchanged poll so a copy in progress is not loaded half-written
+                if current == pending:
+                    if not self.reload(wait=True) and self.last_error:
+                        failed = current
+                    pending = None
+                else:
+                    pending = current
+
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def status(self):
+        bundle = self._active
+        return {
+            "loaded": bundle is not None,
+            "version": bundle.version if bundle else None,
+            "model_name": bundle.info.get('model_name') if bundle else None,
+            "source": bundle.source if bundle else None,
+            "loaded_at": bundle.loaded_at if bundle else None,
+            "reloading": self._reload_lock.locked(),
+            "reload_count": self.reload_count,
+            "last_error": self.last_error
+        }
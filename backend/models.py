@@ -1,11 +1,12 @@
 import datetime
 from datetime import timezone
-import bcrypt
 
 try:
     from .extensions import db
+    from .password_hasher import hash_password, verify_password, upgrade_password
 except (ImportError, ValueError):
     from extensions import db
+    from password_hasher import hash_password, verify_password, upgrade_password
 
 def utcnow():
     return datetime.datetime.now(timezone.utc)
@@ -29,26 +30,30 @@ class User(db.Model):
     def __init__(self, username, email, password, security_question=None, security_answer=None):
         self.username = username
         self.email = email
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password = hash_password(password)
         self.security_question = security_question
         if security_answer:
-            self.security_answer = bcrypt.hashpw(security_answer.lower().strip().encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            self.security_answer = hash_password(security_answer.lower().strip())
         else:
             self.security_answer = None
 
+    def set_password(self, password):
+        self.password = hash_password(password)
+
     def check_password(self, password):
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
-        except Exception:
-            return False
+        return verify_password(password, self.password)
+
+    def upgrade_password(self, password):
+        """Rehash a verified password when BCRYPT_ROUNDS changed; True if the row was modified."""
+        upgraded = upgrade_password(password, self.password)
+        if upgraded:
+            self.password = upgraded
+        return upgraded is not None
 
     def check_security_answer(self, answer):
-        try:
-            if not self.security_answer or not answer:
-                return False
-            return bcrypt.checkpw(answer.lower().strip().encode('utf-8'), self.security_answer.encode('utf-8'))
-        except Exception:
+        if not self.security_answer or not answer:
             return False
+        return verify_password(answer.lower().strip(), self.security_answer)
 
 class Admin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -56,12 +61,14 @@ class Admin(db.Model):
     password = db.Column(db.String(200), nullable=False)
     def __init__(self, username, password):
         self.username = username
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password = hash_password(password)
     def check_password(self, password):
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
-        except Exception:
-            return False
+        return verify_password(password, self.password)
+    def upgrade_password(self, password):
+        upgraded = upgrade_password(password, self.password)
+        if upgraded:
+            self.password = upgraded
+        return upgraded is not None
 
 class PasswordResetToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -72,7 +79,7 @@ class PasswordResetToken(db.Model):
     used = db.Column(db.Boolean, default=False)
 
     def is_valid(self):
-        now = utcnow()
+        now = utcnow().replace(tzinfo=None)
         if self.expires_at.tzinfo is not None:
             expires_naive = self.expires_at.replace(tzinfo=None)
         else:
@@ -94,6 +101,9 @@ class PredictionHistory(db.Model):
     certifications = db.Column(db.Text)
     preferred_industry = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=utcnow)
+
+    # Serves "latest predictions of a user" and keyset pages without a sort
+    __table_args__ = (db.Index('ix_prediction_history_user_created_id', 'user_id', created_at.desc(), id.desc()),)
     
     def to_dict(self):
         now = utcnow()
@@ -140,3 +150,9 @@ class PredictionHistory(db.Model):
                 'preferred_industry': self.preferred_industry
             }
         }
+
+def ensure_indexes():
+    # create_all() skips indexes on tables that already exist; add any that are missing
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
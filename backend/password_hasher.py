@@ -0,0 +1,161 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+try:
+    from .metrics import Histogram
+except (ImportError, ValueError):
+    from metrics import Histogram
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing pool's queue is full or a job waited longer than the timeout."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool so login and registration
+    bursts use at most `workers` cores and cannot starve other endpoints.
+    At most workers + max_queue jobs are admitted; further callers get
+    PasswordHasherBusy immediately instead of piling up behind the pool.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_queue=64, timeout=10.0):
+        self.rounds = int(rounds)
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout = float(timeout)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._executor = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.hashes = 0
+        self.verifies = 0
+        self.rehashes = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128])
+        self.wait_ms = Histogram([1, 5, 10, 25, 50, 100, 250, 1000, 5000])
+        self.work_ms = Histogram([10, 25, 50, 100, 250, 500, 1000, 2500])
+
+    def _get_executor(self):
+        # Created per process so forked workers (e.g. gunicorn --preload) get their own threads
+        if self._executor is None or self._pid != os.getpid():
+            with self._start_lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _release(self, future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise PasswordHasherBusy("Password hashing queue is full")
+        with self._lock:
+            self.in_flight += 1
+            depth = max(0, self.in_flight - self.workers)
+        self.queue_depth.observe(depth)
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            self.wait_ms.observe((started - submitted) * 1000)
+            try:
+                return fn(*args)
+            finally:
+                self.work_ms.observe((time.perf_counter() - started) * 1000)
+
+        try:
+            future = self._get_executor().submit(job)
+        except Exception:
+            self._release()
+            raise
+        # The slot is held until the job really finishes, even if the caller gives up
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._count('timeouts')
+            raise PasswordHasherBusy(f"Password hashing took longer than {self.timeout:g}s")
+
+    def hash(self, secret):
+        self._count('hashes')
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, secret.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, secret, hashed):
+        """bcrypt.checkpw on the pool; False for malformed hashes, PasswordHasherBusy propagates."""
+        if not secret or not hashed:
+            return False
+        self._count('verifies')
+        try:
+            return self._run(bcrypt.checkpw, secret.encode('utf-8'), hashed.encode('utf-8'))
+        except PasswordHasherBusy:
+            raise
+        except Exception:
+            return False
+
+    def needs_rehash(self, hashed):
+        """True when the stored hash uses a different cost than the configured rounds."""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def upgrade(self, secret, hashed):
+        """New hash at the configured cost for an already verified secret, or None if `hashed` is current."""
+        if not self.needs_rehash(hashed):
+            return None
+        self._count('rehashes')
+        return self.hash(secret)
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                "in_flight": self.in_flight,
+                "hashes": self.hashes,
+                "verifies": self.verifies,
+                "rehashes": self.rehashes,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts
+            }
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            **counters,
+            "queue_depth": self.queue_depth.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+            "work_ms": self.work_ms.snapshot()
+        }
+
+
+# Process-wide hasher used by the models; replaced by the app with the configured settings
+PASSWORD_HASHER = PasswordHasher()
+
+
+def hash_password(secret):
+    return PASSWORD_HASHER.hash(secret)
+
+
+def verify_password(secret, hashed):
+    return PASSWORD_HASHER.verify(secret, hashed)
+
+
+def upgrade_password(secret, hashed):
+    return PASSWORD_HASHER.upgrade(secret, hashed)
@@ -0,0 +1,176 @@
+import os
+import time
+import sqlite3
+import threading
+from math import floor
+from contextlib import contextmanager
+
+from limits.storage import Storage
+from limits.storage.base import MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS events (key TEXT NOT NULL, at REAL NOT NULL, expires_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_events_key_at ON events (key, at)",
+)
+
+# Upsert that restarts an expired window and returns the new count in one statement
+INCR_SQL = (
+    "INSERT INTO counters (key, value, expires_at) VALUES (?1, ?2, ?3) "
+    "ON CONFLICT(key) DO UPDATE SET "
+    "value = CASE WHEN expires_at <= ?4 THEN excluded.value ELSE value + excluded.value END, "
+    "expires_at = CASE WHEN expires_at <= ?4 THEN excluded.expires_at ELSE expires_at END "
+    "RETURNING value"
+)
+
+# Same, but every hit pushes the window's end out again (limits 4.x fixed-window-elastic-expiry)
+INCR_ELASTIC_SQL = (
+    "INSERT INTO counters (key, value, expires_at) VALUES (?1, ?2, ?3) "
+    "ON CONFLICT(key) DO UPDATE SET "
+    "value = CASE WHEN expires_at <= ?4 THEN excluded.value ELSE value + excluded.value END, "
+    "expires_at = excluded.expires_at "
+    "RETURNING value"
+)
+
+
+class SQLiteStorage(Storage, MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit storage in a local WAL-mode SQLite file, so every worker
+    process on the host shares one set of counters without an external
+    service. Supports the fixed-window, moving-window and
+    sliding-window-counter strategies.
+
+    URIs follow SQLAlchemy's convention: ``sqlite:///relative/path.db`` or
+    ``sqlite:////absolute/path.db``.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+    PRUNE_EVERY = 1000
+
+    def __init__(self, uri=None, wrap_exceptions=False, timeout=5.0, **options):
+        path = (uri or 'sqlite:///ratelimit.db').split('://', 1)[1]
+        self.path = path[1:] if path.startswith('/') else path
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._ops = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        # One connection per thread and process; connections must not cross a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _write_transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so read-check-write sequences are atomic across processes
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _maybe_prune(self, conn, now):
+        self._ops += 1
+        if self._ops % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM events WHERE expires_at <= ?", (now,))
+
+    def _incr(self, conn, key, expiry, amount, now, elastic_expiry=False):
+        return conn.execute(INCR_ELASTIC_SQL if elastic_expiry else INCR_SQL, (key, amount, now + expiry, now)).fetchone()[0]
+
+    def _get(self, conn, key, now):
+        row = conn.execute("SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        # limits 4.x passes elastic_expiry; 5.x dropped it and passes amount by keyword
+        conn = self._connect()
+        now = time.time()
+        self._maybe_prune(conn, now)
+        return self._incr(conn, key, expiry, amount, now, elastic_expiry)
+
+    def get(self, key):
+        return self._get(self._connect(), key, time.time())
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connect().execute("SELECT expires_at FROM counters WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        return row[0] if row else now
+
+    def check(self):
+        try:
+            self._connect().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._write_transaction() as conn:
+            return conn.execute("DELETE FROM counters").rowcount + conn.execute("DELETE FROM events").rowcount
+
+    def clear(self, key):
+        with self._write_transaction() as conn:
+            conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM events WHERE key = ?", (key,))
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._write_transaction() as conn:
+            conn.execute("DELETE FROM events WHERE key = ? AND at <= ?", (key, now - expiry))
+            count = conn.execute("SELECT COUNT(*) FROM events WHERE key = ?", (key,)).fetchone()[0]
+            if count + amount > limit:
+                return False
+            conn.executemany("INSERT INTO events (key, at, expires_at) VALUES (?, ?, ?)", [(key, now, now + expiry)] * amount)
+            return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        start, count = self._connect().execute("SELECT MIN(at), COUNT(*) FROM events WHERE key = ? AND at > ?", (key, now - expiry)).fetchone()
+        return (start, count) if count else (now, 0)
+
+    def _sliding_window(self, conn, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(conn, previous_key, now)
+        current_count = self._get(conn, current_key, now)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        # Unlike the in-memory storage, no optimistic increment/decrement: the check and the hit share one transaction
+        with self._write_transaction() as conn:
+            previous_count, previous_ttl, current_count, _ = self._sliding_window(conn, key, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+            self._maybe_prune(conn, now)
+            # The current window's counter must outlive it to serve as the next "previous" window
+            self._incr(conn, self.sliding_window_keys(key, expiry, now)[1], 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key, expiry):
+        return self._sliding_window(self._connect(), key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        for window_key in self.sliding_window_keys(key, expiry, time.time()):
+            self.clear(window_key)
@@ -1,16 +1,33 @@
-from flask import Blueprint, request, jsonify, current_app
+import io
+import csv
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, url_for
+from sqlalchemy import select
 
 try:
     from ..extensions import db
     from ..models import User, Admin
-    from ..utils import admin_required, generate_token
+    from ..utils import admin_required, generate_token, invalidate_principal
+    from . import prediction as pred_module
+    from .profile import release_picture
+    from .. import utils as utils_module
+    from .. import password_hasher
 except (ImportError, ValueError):
     from extensions import db
     from models import User, Admin
-    from utils import admin_required, generate_token
+    from utils import admin_required, generate_token, invalidate_principal
+    from routes import prediction as pred_module
+    from routes.profile import release_picture
+    import utils as utils_module
+    import password_hasher
 
 admin_bp = Blueprint('admin', __name__)
 
+USERS_PAGE_SIZE = 100
+USERS_MAX_PAGE_SIZE = 1000
+# Rows fetched per round-trip by the export's server-side cursor
+EXPORT_BATCH_SIZE = 1000
+USER_EXPORT_COLUMNS = (User.id, User.username, User.email, User.phone, User.location, User.headline, User.created_at)
+
 @admin_bp.route('/admin/login', methods=['POST'])
 def admin_login():
     data = request.get_json() or {}
@@ -19,6 +36,9 @@ def admin_login():
     admin = Admin.query.filter_by(username=username).first()
     if not admin or not admin.check_password(password):
         return jsonify({"message": "Invalid admin credentials"}), 401
+    if admin.upgrade_password(password):
+        db.session.commit()
+        invalidate_principal(Admin, admin.id)
     payload = {"admin_id": admin.id, "role": "admin"}
     token = generate_token(payload, current_app.config['ACCESS_TOKEN_EXPIRES'] * 4)
     return jsonify({"token": token, "message": "Admin login successful"}), 200
@@ -26,8 +46,70 @@ def admin_login():
 @admin_bp.route('/api/users', methods=['GET'])
 @admin_required
 def admin_get_users(admin):
-    users = User.query.all()
-    return jsonify([{"id": u.id, "username": u.username, "email": u.email} for u in users]), 200
+    if 'limit' not in request.args and 'after' not in request.args:
+        # Unpaginated callers keep getting the whole list, streamed from a server-side cursor
+        return Response(stream_with_context(stream_user_list()), mimetype='application/json')
+    try:
+        limit = max(1, min(int(request.args.get('limit', USERS_PAGE_SIZE)), USERS_MAX_PAGE_SIZE))
+        after = int(request.args.get('after', 0))
+    except ValueError:
+        return jsonify({"message": "Invalid limit or cursor"}), 400
+    # Only the listed columns, keyset-paginated on the primary key; the next cursor goes in headers so the body stays a plain list
+    rows = db.session.execute(select(User.id, User.username, User.email).where(User.id > after).order_by(User.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response = jsonify([{"id": r.id, "username": r.username, "email": r.email} for r in rows])
+    if has_more:
+        next_cursor = str(rows[-1].id)
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for("admin.admin_get_users", after=next_cursor, limit=limit)}>; rel="next"'
+    return response, 200
+
+def stream_user_list():
+    """The full user list as one JSON array, written EXPORT_BATCH_SIZE rows at a time."""
+    result = db.session.execute(select(User.id, User.username, User.email).order_by(User.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+    separator = '['
+    for partition in result.partitions():
+        yield separator + ','.join(current_app.json.dumps({"id": r.id, "username": r.username, "email": r.email}) for r in partition)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+def export_batches(result):
+    """Row dicts from a streamed result, one list per fetch of EXPORT_BATCH_SIZE rows."""
+    for partition in result.partitions():
+        rows = [row._asdict() for row in partition]
+        for row in rows:
+            row['created_at'] = row['created_at'].isoformat() if row['created_at'] else None
+        yield rows
+
+@admin_bp.route('/api/users/export', methods=['GET'])
+@admin_required
+def admin_export_users(admin):
+    fmt = request.args.get('format', 'ndjson').lower()
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({"message": "format must be ndjson or csv"}), 400
+    fields = [column.key for column in USER_EXPORT_COLUMNS]
+
+    def generate():
+        # yield_per streams from a server-side cursor, so memory stays flat whatever the table size
+        result = db.session.execute(select(*USER_EXPORT_COLUMNS).order_by(User.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        if fmt == 'csv':
+            writer.writeheader()
+        for rows in export_batches(result):
+            if fmt == 'ndjson':
+                yield ''.join(current_app.json.dumps(row) + '\n' for row in rows)
+                continue
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if fmt == 'csv' and buffer.tell():
+            yield buffer.getvalue()
+
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'text/csv'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={"Content-Disposition": f"attachment; filename=users.{fmt}"})
 
 @admin_bp.route('/admin/users/<int:user_id>', methods=['DELETE'])
 @admin_required
@@ -35,6 +117,45 @@ def admin_delete_user(admin, user_id):
     user = db.session.get(User, user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
+    picture = user.profile_picture
     db.session.delete(user)
     db.session.commit()
+    invalidate_principal(User, user_id)
+    release_picture(picture)
     return jsonify({"message": "User deleted"}), 200
+
+@admin_bp.route('/admin/metrics', methods=['GET'])
+@admin_required
+def admin_metrics(admin):
+    cache = pred_module.PREDICTION_CACHE
+    registry = pred_module.MODEL_REGISTRY
+    scheduler = pred_module.INFERENCE_SCHEDULER
+    writer = pred_module.HISTORY_WRITER
+    principals = utils_module.PRINCIPAL_CACHE
+    hasher = password_hasher.PASSWORD_HASHER
+    return jsonify({"model": registry.status() if registry is not None else None, "prediction_cache": cache.stats() if cache is not None else None, "inference_scheduler": scheduler.stats() if scheduler is not None else None, "history_writer": writer.stats() if writer is not None else None, "principal_cache": principals.stats() if principals is not None else None, "password_hasher": hasher.stats()}), 200
+
+@admin_bp.route('/admin/models', methods=['GET'])
+@admin_required
+def admin_model_status(admin):
+    registry = pred_module.MODEL_REGISTRY
+    if registry is None:
+        return jsonify({"message": "Model registry not initialized"}), 503
+    return jsonify(registry.status()), 200
+
+@admin_bp.route('/admin/models/reload', methods=['POST'])
+@admin_required
+def admin_reload_model(admin):
+    registry = pred_module.MODEL_REGISTRY
+    if registry is None:
+        return jsonify({"message": "Model registry not initialized"}), 503
+    wait = request.args.get('wait', 'false').lower() in ('1', 'true', 'yes')
+    if wait:
+        if registry.reload(wait=True):
+            return jsonify({"message": "Model reloaded", **registry.status()}), 200
+        if registry.status()['reloading']:
+            return jsonify({"message": "Reload already in progress"}), 409
+        return jsonify({"message": "Reload failed, previous model still active", **registry.status()}), 500
+    if not registry.reload():
+        return jsonify({"message": "Reload already in progress"}), 409
+    return jsonify({"message": "Reload started", **registry.status()}), 202
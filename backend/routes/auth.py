@@ -4,17 +4,17 @@ from flask import Blueprint, request, jsonify, make_response, current_app
 
 try:
     from ..extensions import db, limiter
-    from ..models import User, PasswordResetToken
+    from ..models import User, PasswordResetToken, utcnow
     from ..utils import (
         sanitize_input, validate_email, validate_password_strength, 
-        generate_token, generate_reset_token, utcnow
+        generate_token, generate_reset_token, invalidate_principal
     )
 except (ImportError, ValueError):
     from extensions import db, limiter
-    from models import User, PasswordResetToken
+    from models import User, PasswordResetToken, utcnow
     from utils import (
         sanitize_input, validate_email, validate_password_strength, 
-        generate_token, generate_reset_token, utcnow
+        generate_token, generate_reset_token, invalidate_principal
     )
 
 auth_bp = Blueprint('auth', __name__)
@@ -38,6 +38,7 @@ def register():
         return jsonify({"message": msg}), 400
     if User.query.filter_by(email=email).first():
         return jsonify({"message": "Email already registered"}), 409
+    db.session.close()
     user = User(username, email, password, security_question, security_answer)
     db.session.add(user)
     db.session.commit()
@@ -53,8 +54,15 @@ def login():
     if not email or not password:
         return jsonify({"message": "Email and password required"}), 400
     user = User.query.filter_by(email=email).first()
+    # End the read transaction before bcrypt runs; on SQLite an open reader blocks every writer's commit
+    db.session.close()
     if not user or not user.check_password(password):
         return jsonify({"message": "Invalid credentials"}), 401
+    # Move the stored hash to the current BCRYPT_ROUNDS while the plaintext is at hand
+    if user.upgrade_password(password):
+        db.session.add(user)
+        db.session.commit()
+        invalidate_principal(User, user.id)
 
     access_token_expires = current_app.config['ACCESS_TOKEN_EXPIRES']
     refresh_token_expires = current_app.config['REFRESH_TOKEN_EXPIRES']
@@ -142,8 +150,8 @@ def reset_password():
     user = db.session.get(User, reset.user_id)
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
-    import bcrypt
-    user.password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    user.set_password(new_password)
     reset.used = True
     db.session.commit()
+    invalidate_principal(User, user.id)
     return jsonify({"success": True, "message": "Password reset successful"}), 200
@@ -1,22 +1,49 @@
 import os
+import json
+import base64
+import hashlib
+import datetime
+import threading
+from collections import namedtuple
 import pandas as pd
 import numpy as np
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from sqlalchemy import insert, and_, or_
 
 try:
     from ..extensions import db
     from ..models import PredictionHistory
     from ..utils import login_required
+    from ..cache import TTLCache
 except (ImportError, ValueError):
     from extensions import db
     from models import PredictionHistory
     from utils import login_required
+    from cache import TTLCache
 
 prediction_bp = Blueprint('prediction', __name__)
 
 # These will be set by the app
-ML_MODEL = None
-ML_PREPROCESSOR = None
+MODEL_REGISTRY = None
+PREDICTION_CACHE = TTLCache(maxsize=4096, ttl=600)
+INFERENCE_SCHEDULER = None
+HISTORY_WRITER = None
+
+PROFILE_TEXT_FIELDS = ('degree', 'major', 'specialization', 'skills', 'certifications', 'preferred_industry')
+REQUIRED_PROFILE_FIELDS = ('degree', 'major', 'specialization', 'preferred_industry', 'skills')
+BATCH_CHUNK_SIZE = 500
+# Up to this many profiles, stacking inference-plan rows beats the vectorized DataFrame transform
+PLAN_BATCH_MAX = 128
+BATCH_MAX_PROFILES = 10000
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+OPTIONS_MAX_AGE = 300
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Serialized /api/get-options payload, rebuilt when JobRole.csv changes; replaced as a whole so readers never mix generations
+OptionsPayload = namedtuple('OptionsPayload', ['key', 'body', 'etag'])
+OPTIONS_CACHE = OptionsPayload(None, None, None)
+_options_lock = threading.Lock()
 
 def estimate_salary(job_role, years_of_experience, cgpa):
     salary_ranges = {
@@ -59,73 +86,279 @@ def generate_roadmap(job_role):
     }
     return roadmaps.get(job_role, [{"step": i+1, "title": f"Step {i+1}", "desc": f"Learn {job_role} basics"} for i in range(6)])
 
+def parse_profile(data):
+    """Validate one prediction input. Returns (profile, None) or (None, error message)."""
+    if not isinstance(data, dict):
+        return None, "Profile must be a JSON object"
+    profile = {key: str(data.get(key) or '').strip() for key in PROFILE_TEXT_FIELDS}
+    if not all(profile[key] for key in REQUIRED_PROFILE_FIELDS):
+        return None, "Required fields missing"
+    try:
+        profile['cgpa'], profile['years_of_experience'] = float(data.get('cgpa')), float(data.get('years_of_experience'))
+    except (TypeError, ValueError):
+        return None, "Invalid numeric format"
+    return profile, None
+
+def profile_to_record(profile):
+    return {'Degree': profile['degree'], 'Major': profile['major'], 'Specialization': profile['specialization'], 'CGPA': profile['cgpa'], 'Skills': profile['skills'], 'Certification': profile['certifications'] or 'None', 'Years of Experience': profile['years_of_experience'], 'Preferred Industry': profile['preferred_industry']}
+
+def active_bundle():
+    """The ModelBundle serving requests right now; read once per request so a hot reload never mixes models."""
+    return MODEL_REGISTRY.active if MODEL_REGISTRY is not None else None
+
+def _canonical_text(value):
+    return ' '.join(value.lower().split())
+
+def _canonical_set(value):
+    return sorted({_canonical_text(item) for item in value.split(',') if item.strip()})
+
+def prediction_cache_key(profile, model_token):
+    """Cache key for a profile: case/spacing/order-insensitive text, rounded numbers, scoped to the loaded model."""
+    canonical = {key: _canonical_text(profile[key]) for key in ('degree', 'major', 'specialization', 'preferred_industry')}
+    canonical.update(skills=_canonical_set(profile['skills']), certifications=_canonical_set(profile['certifications']), cgpa=round(profile['cgpa'], 2), years_of_experience=round(profile['years_of_experience'], 1))
+    digest = hashlib.sha1(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"pred:{model_token}:{digest}"
+
+def build_predictions(probs, top_indices, class_names, profile):
+    return [{"job_role": str(class_names[i]), "confidence": round(probs[i]*100, 1), "salary": estimate_salary(str(class_names[i]), profile['years_of_experience'], profile['cgpa'])} for i in top_indices if probs[i]*100 > 1]
+
+def predict_single(profile, bundle):
+    """Score one profile with the bundle's inference plan, or its DataFrame path when no plan compiled."""
+    record = profile_to_record(profile)
+    if bundle.plan is not None:
+        probs = bundle.plan.predict_proba(record)
+        top_indices = bundle.plan.top_k(probs, 5)
+        class_names = bundle.plan.class_names
+    else:
+        X_transformed = bundle.preprocessor.transform(pd.DataFrame([record]), is_training=False)
+        probs = bundle.model.predict_proba(X_transformed)[0]
+        top_indices = np.argsort(probs)[-5:][::-1]
+        class_names = bundle.preprocessor.label_encoders.get('Job Role').classes_
+    return build_predictions(probs, top_indices, class_names, profile)
+
+def predict_profiles(profiles, bundle):
+    """Score many profiles with one transform (plan rows or a sparse vectorized matrix) and one predict_proba call."""
+    records = [profile_to_record(p) for p in profiles]
+    if bundle.plan is not None and len(records) <= PLAN_BATCH_MAX:
+        probs = bundle.plan.predict_proba_batch(records)
+    else:
+        probs = bundle.model.predict_proba(bundle.preprocessor.transform(pd.DataFrame(records), is_training=False, sparse=True))
+    class_names = bundle.preprocessor.label_encoders.get('Job Role').classes_
+    k = min(5, probs.shape[1])
+    top = np.argpartition(probs, -k, axis=1)[:, -k:]
+    top = np.take_along_axis(top, np.argsort(np.take_along_axis(probs, top, axis=1), axis=1)[:, ::-1], axis=1)
+    return [build_predictions(probs[row], top[row], class_names, profile) for row, profile in enumerate(profiles)]
+
+def fallback_predictions(profile):
+    return generate_job_predictions_fallback(profile['degree'], profile['major'], profile['specialization'], profile['cgpa'], profile['years_of_experience'], profile['skills'], profile['certifications'], profile['preferred_industry'])
+
+def history_row(user_id, profile, top_pred):
+    return dict(user_id=user_id, predicted_role=top_pred['job_role'], confidence=top_pred['confidence'], salary_range=top_pred['salary'], degree=profile['degree'], major=profile['major'], specialization=profile['specialization'], cgpa=profile['cgpa'], years_of_experience=profile['years_of_experience'], skills=profile['skills'], certifications=profile['certifications'], preferred_industry=profile['preferred_industry'])
+
 @prediction_bp.route('/api/predict-job', methods=['POST'])
 @login_required
 def predict_job(user):
     try:
-        data = request.get_json() or {}
-        degree, major, specialization = data.get('degree', '').strip(), data.get('major', '').strip(), data.get('specialization', '').strip()
-        cgpa, years_of_experience = data.get('cgpa'), data.get('years_of_experience')
-        skills, certifications, preferred_industry = data.get('skills', '').strip(), data.get('certifications', '').strip(), data.get('preferred_industry', '').strip()
-
-        if not all([degree, major, specialization, preferred_industry, skills]):
-            return jsonify({"success": False, "message": "Required fields missing"}), 400
-
-        try:
-            cgpa, years_of_experience = float(cgpa), float(years_of_experience)
-        except:
-            return jsonify({"success": False, "message": "Invalid numeric format"}), 400
+        profile, error = parse_profile(request.get_json(silent=True) or {})
+        if error:
+            return jsonify({"success": False, "message": error}), 400
 
-        if ML_MODEL and ML_PREPROCESSOR:
-            try:
-                input_df = pd.DataFrame([{'Degree': degree, 'Major': major, 'Specialization': specialization, 'CGPA': cgpa, 'Skills': skills, 'Certification': certifications or 'None', 'Years of Experience': years_of_experience, 'Preferred Industry': preferred_industry}])
-                X_transformed = ML_PREPROCESSOR.transform(input_df, is_training=False)
-                probs = ML_MODEL.predict_proba(X_transformed)[0]
-                top_indices = np.argsort(probs)[-5:][::-1]
-                encoder = ML_PREPROCESSOR.label_encoders.get('Job Role')
-                preds = [{"job_role": encoder.inverse_transform([i])[0], "confidence": round(probs[i]*100, 1), "salary": estimate_salary(encoder.inverse_transform([i])[0], years_of_experience, cgpa)} for i in top_indices if probs[i]*100 > 1]
-            except Exception as e:
-                current_app.logger.error(f"ML error: {e}")
-                preds = generate_job_predictions_fallback(degree, major, specialization, cgpa, years_of_experience, skills, certifications, preferred_industry)
+        bundle = active_bundle()
+        if bundle is not None:
+            cache_key = prediction_cache_key(profile, bundle.cache_token)
+            preds = PREDICTION_CACHE.get(cache_key) if PREDICTION_CACHE is not None else None
+            if preds is None:
+                try:
+                    if INFERENCE_SCHEDULER is not None:
+                        try:
+                            preds = INFERENCE_SCHEDULER.submit(profile, bundle)
+                        except Exception as e:
+                            current_app.logger.warning(f"Inference scheduler unavailable, scoring inline: {e!r}")
+                    if preds is None:
+                        preds = predict_single(profile, bundle)
+                except Exception as e:
+                    current_app.logger.error(f"ML error: {e}")
+                    preds = fallback_predictions(profile)
+                else:
+                    if preds and PREDICTION_CACHE is not None:
+                        PREDICTION_CACHE.set(cache_key, preds)
         else:
-            preds = generate_job_predictions_fallback(degree, major, specialization, cgpa, years_of_experience, skills, certifications, preferred_industry)
+            preds = fallback_predictions(profile)
 
         top_pred = preds[0]
-        history_entry = PredictionHistory(user_id=user.id, predicted_role=top_pred['job_role'], confidence=top_pred['confidence'], salary_range=top_pred['salary'], degree=degree, major=major, specialization=specialization, cgpa=cgpa, years_of_experience=years_of_experience, skills=skills, certifications=certifications, preferred_industry=preferred_industry)
-        db.session.add(history_entry)
-        db.session.commit()
+        if HISTORY_WRITER is not None:
+            HISTORY_WRITER.submit(history_row(user.id, profile, top_pred))
+        else:
+            db.session.add(PredictionHistory(**history_row(user.id, profile, top_pred)))
+            db.session.commit()
 
-        return jsonify({"success": True, "predicted_role": top_pred['job_role'], "match_percentage": top_pred['confidence'], "salary_range": top_pred['salary'], "description": f"As a {top_pred['job_role']}, you will work in {preferred_industry}.", "roadmap": generate_roadmap(top_pred['job_role']), "top_alternative_roles": [{"role": p['job_role'], "match": p['confidence']} for p in preds[1:4]]}), 200
+        return jsonify({"success": True, "predicted_role": top_pred['job_role'], "match_percentage": top_pred['confidence'], "salary_range": top_pred['salary'], "description": f"As a {top_pred['job_role']}, you will work in {profile['preferred_industry']}.", "roadmap": generate_roadmap(top_pred['job_role']), "top_alternative_roles": [{"role": p['job_role'], "match": p['confidence']} for p in preds[1:4]]}), 200
     except Exception as e:
         current_app.logger.error(f"Predict error: {e}")
         db.session.rollback()
         return jsonify({"success": False, "message": "Internal error"}), 500
 
+def iter_batch_profiles(items):
+    """Yield (index, profile, error) for raw batch items; NDJSON lines are decoded lazily."""
+    for index, item in enumerate(items):
+        if isinstance(item, bytes):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                item = json.loads(item)
+            except ValueError:
+                yield index, None, "Invalid JSON"
+                continue
+        profile, error = parse_profile(item)
+        yield index, profile, error
+
+def score_profiles(profiles, bundle):
+    """Predictions for a chunk of validated profiles: one vectorized transform and one predict_proba call."""
+    if bundle is not None:
+        try:
+            return predict_profiles(profiles, bundle)
+        except Exception as e:
+            current_app.logger.error(f"Batch ML error: {e}")
+    return [fallback_predictions(p) for p in profiles]
+
+@prediction_bp.route('/api/predict-job/batch', methods=['POST'])
+@login_required
+def predict_job_batch(user):
+    """Score many profiles; accepts a JSON array or NDJSON and streams NDJSON results chunk by chunk."""
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = request.stream
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({"success": False, "message": "Expected a JSON array of profiles or an NDJSON body"}), 400
+    save_history = request.args.get('save_history', 'true').lower() not in ('0', 'false', 'no')
+    chunk_size = current_app.config.get('BATCH_CHUNK_SIZE', BATCH_CHUNK_SIZE)
+    max_profiles = current_app.config.get('BATCH_MAX_PROFILES', BATCH_MAX_PROFILES)
+    user_id = user.id
+    bundle = active_bundle()
+
+    def process(chunk):
+        valid = [(index, profile) for index, profile, error in chunk if not error]
+        preds_by_index = dict(zip([index for index, _ in valid], score_profiles([p for _, p in valid], bundle))) if valid else {}
+        lines, rows = [], []
+        for index, profile, error in chunk:
+            if error:
+                lines.append({"index": index, "success": False, "message": error})
+                continue
+            preds = preds_by_index[index]
+            top_pred = preds[0]
+            rows.append(history_row(user_id, profile, top_pred))
+            lines.append({"index": index, "success": True, "predicted_role": top_pred['job_role'], "match_percentage": top_pred['confidence'], "salary_range": top_pred['salary'], "top_alternative_roles": [{"role": p['job_role'], "match": p['confidence']} for p in preds[1:4]]})
+        if save_history and rows and HISTORY_WRITER is not None:
+            HISTORY_WRITER.submit_many(rows)
+        elif save_history and rows:
+            try:
+                db.session.execute(insert(PredictionHistory), rows)
+                db.session.commit()
+            except Exception as e:
+                current_app.logger.error(f"Batch history error: {e}")
+                db.session.rollback()
+        return lines
+
+    def generate():
+        counts = {"total": 0, "succeeded": 0, "failed": 0}
+
+        def emit(chunk):
+            lines = process(chunk)
+            for line in lines:
+                counts["total"] += 1
+                counts["succeeded" if line["success"] else "failed"] += 1
+            return ''.join(current_app.json.dumps(line) + '\n' for line in lines)
+
+        chunk = []
+        for index, profile, error in iter_batch_profiles(items):
+            if index >= max_profiles:
+                chunk.append((index, None, f"Batch limit of {max_profiles} profiles exceeded"))
+                break
+            chunk.append((index, profile, error))
+            if len(chunk) >= chunk_size:
+                yield emit(chunk)
+                chunk = []
+        if chunk:
+            yield emit(chunk)
+        yield current_app.json.dumps({"done": True, **counts}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def encode_history_cursor(entry):
+    raw = f"{entry.created_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_history_cursor(cursor):
+    """(created_at, id) of the last entry on the previous page; raises ValueError for a malformed cursor."""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    created_at, entry_id = raw.rsplit('|', 1)
+    return datetime.datetime.fromisoformat(created_at), int(entry_id)
+
 @prediction_bp.route('/api/prediction-history', methods=['GET'])
 @login_required
 def get_prediction_history(user):
-    predictions = PredictionHistory.query.filter_by(user_id=user.id).order_by(PredictionHistory.created_at.desc()).limit(50).all()
-    return jsonify({"history": [p.to_dict() for p in predictions]}), 200
+    try:
+        limit = max(1, min(int(request.args.get('limit', HISTORY_PAGE_SIZE)), HISTORY_MAX_PAGE_SIZE))
+        before = request.args.get('before')
+        cursor = decode_history_cursor(before) if before else None
+    except (ValueError, UnicodeDecodeError):
+        return jsonify({"message": "Invalid limit or cursor"}), 400
+
+    # Keyset pagination over the (user_id, created_at DESC, id) index: no OFFSET scan, no sort
+    query = PredictionHistory.query.filter_by(user_id=user.id)
+    if cursor:
+        created_at, entry_id = cursor
+        query = query.filter(or_(PredictionHistory.created_at < created_at, and_(PredictionHistory.created_at == created_at, PredictionHistory.id < entry_id)))
+    predictions = query.order_by(PredictionHistory.created_at.desc(), PredictionHistory.id.desc()).limit(limit + 1).all()
+    has_more = len(predictions) > limit
+    predictions = predictions[:limit]
+    return jsonify({"history": [p.to_dict() for p in predictions], "has_more": has_more, "next_cursor": encode_history_cursor(predictions[-1]) if has_more else None}), 200
+
+def options_csv_path(app):
+    csv_path = os.path.join(app.root_path, 'models/JobRole.csv')
+    if not os.path.exists(csv_path):
+        csv_path = os.path.join(os.path.dirname(app.root_path), 'JobRole.csv')
+    return csv_path
+
+def build_options(csv_path):
+    df = pd.read_csv(csv_path)
+    all_skills = set(df['Skills'].dropna().str.split(',').explode().str.strip())
+    all_skills.update(["Python", "Java", "JavaScript", "React", "Node.js", "SQL", "AWS", "Docker", "Git"])
+    return {
+        'Degree': sorted(df['Degree'].unique().tolist()),
+        'Major': sorted(df['Major'].unique().tolist()),
+        'Specialization': sorted(df['Specialization'].unique().tolist()) if 'Specialization' in df.columns else [],
+        'Preferred Industry': sorted(df['Preferred Industry'].unique().tolist()),
+        'Skills': sorted(list(all_skills)),
+        'Certifications': sorted(list(set(df['Certification'].dropna().str.split(',').explode().str.strip()) | {"AWS Certified", "PMP", "Google Analytics"}))
+    }
+
+def load_options_payload(app):
+    """Serialized options and their ETag as one OptionsPayload; rebuilt only when the CSV's path, mtime or size changes."""
+    global OPTIONS_CACHE
+    csv_path = options_csv_path(app)
+    stat = os.stat(csv_path)
+    key = (csv_path, stat.st_mtime_ns, stat.st_size)
+    payload = OPTIONS_CACHE
+    if payload.key != key:
+        with _options_lock:
+            payload = OPTIONS_CACHE
+            if payload.key != key:
+                body = app.json.dumps(build_options(csv_path)).encode('utf-8')
+                payload = OPTIONS_CACHE = OptionsPayload(key, body, hashlib.sha256(body).hexdigest())
+                app.logger.info(f"✅ Options index built from {csv_path}")
+    return payload
 
 @prediction_bp.route('/api/get-options', methods=['GET'])
 def get_options():
     try:
-        csv_path = os.path.join(current_app.root_path, 'models/JobRole.csv')
-        if not os.path.exists(csv_path):
-            csv_path = os.path.join(os.path.dirname(current_app.root_path), 'JobRole.csv')
-        
-        df = pd.read_csv(csv_path)
-        all_skills = set(df['Skills'].dropna().str.split(',').explode().str.strip())
-        all_skills.update(["Python", "Java", "JavaScript", "React", "Node.js", "SQL", "AWS", "Docker", "Git"])
-        
-        return jsonify({
-            'Degree': sorted(df['Degree'].unique().tolist()),
-            'Major': sorted(df['Major'].unique().tolist()),
-            'Specialization': sorted(df['Specialization'].unique().tolist()) if 'Specialization' in df.columns else [],
-            'Preferred Industry': sorted(df['Preferred Industry'].unique().tolist()),
-            'Skills': sorted(list(all_skills)),
-            'Certifications': sorted(list(set(df['Certification'].dropna().str.split(',').explode().str.strip()) | {"AWS Certified", "PMP", "Google Analytics"}))
-        }), 200
+        _, body, etag = load_options_payload(current_app)
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'public, max-age={OPTIONS_MAX_AGE}'
+        return response.make_conditional(request)
     except Exception as e:
         current_app.logger.error(f"Options error: {e}")
         return jsonify({"message": "Error loading options"}), 500
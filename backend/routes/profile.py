@@ -1,17 +1,43 @@
-import os
-import time
 import base64
 from flask import Blueprint, request, jsonify, current_app
+from werkzeug.formparser import parse_form_data
+from werkzeug.exceptions import RequestEntityTooLarge
 
 try:
     from ..extensions import db
-    from ..utils import login_required, sanitize_input
+    from ..models import User
+    from ..utils import login_required, sanitize_input, invalidate_principal
+    from ..media_store import ImageTooLarge, UnsupportedImage
 except (ImportError, ValueError):
     from extensions import db
-    from utils import login_required, sanitize_input
+    from models import User
+    from utils import login_required, sanitize_input, invalidate_principal
+    from media_store import ImageTooLarge, UnsupportedImage
 
 profile_bp = Blueprint('profile', __name__)
 
+# Set by the app
+MEDIA_STORE = None
+
+# Room for multipart boundaries and part headers on top of the image size cap
+MULTIPART_OVERHEAD = 16 * 1024
+
+def picture_in_use(filename):
+    return db.session.query(User.id).filter_by(profile_picture=filename).first() is not None
+
+def release_picture(filename):
+    """Garbage-collect a superseded profile picture once no user references it."""
+    if not filename or MEDIA_STORE is None or picture_in_use(filename):
+        return
+    app = current_app._get_current_object()
+
+    def is_unreferenced():
+        # Called from a timer thread when the file was still in its grace period
+        with app.app_context():
+            return not picture_in_use(filename)
+
+    MEDIA_STORE.collect(filename, is_unreferenced)
+
 @profile_bp.route('/api/profile', methods=['GET'])
 @login_required
 def get_profile(user):
@@ -23,6 +49,7 @@ def get_profile(user):
         "location": user.location,
         "headline": user.headline,
         "profile_picture": user.profile_picture,
+        "profile_thumbnail": MEDIA_STORE.thumbnail_for(user.profile_picture) if MEDIA_STORE else None,
         "summary": user.summary
     }), 200
 
@@ -30,28 +57,67 @@ def get_profile(user):
 @login_required
 def update_profile(user):
     data = request.get_json() or {}
-    user.phone = sanitize_input(data.get('phone', user.phone))
-    user.location = sanitize_input(data.get('location', user.location))
-    user.headline = sanitize_input(data.get('headline', user.headline), max_length=200)
-    user.summary = sanitize_input(data.get('summary', user.summary), max_length=2000)
-    
+    previous_picture = new_picture = user.profile_picture
+    # Legacy base64 data URL; new clients should use POST /api/profile/picture
     if 'profile_picture' in data and data['profile_picture']:
         try:
             if "," in data['profile_picture']:
-                header, encoded = data['profile_picture'].split(",", 1)
-                ext = "png"
-                if "jpeg" in header or "jpg" in header: ext = "jpg"
-                elif "gif" in header: ext = "gif"
-                
-                filename = f"user_{user.id}_{int(time.time())}.{ext}"
-                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                
-                with open(file_path, "wb") as f:
-                    f.write(base64.b64decode(encoded))
-                
-                user.profile_picture = filename
+                encoded = data['profile_picture'].split(",", 1)[1]
+                if len(encoded) * 3 // 4 > MEDIA_STORE.max_bytes:
+                    raise ImageTooLarge(f"Image exceeds {MEDIA_STORE.max_bytes} bytes")
+                new_picture = MEDIA_STORE.save_bytes(base64.b64decode(encoded))
+        except ImageTooLarge:
+            return jsonify({"message": f"Image must be at most {MEDIA_STORE.max_bytes // 1024} KB"}), 413
+        except UnsupportedImage as e:
+            return jsonify({"message": str(e)}), 415
         except Exception as e:
             current_app.logger.error(f"Image upload failed: {e}")
 
+    user.phone = sanitize_input(data.get('phone', user.phone))
+    user.location = sanitize_input(data.get('location', user.location))
+    user.headline = sanitize_input(data.get('headline', user.headline), max_length=200)
+    user.summary = sanitize_input(data.get('summary', user.summary), max_length=2000)
+    user.profile_picture = new_picture
     db.session.commit()
+    invalidate_principal(type(user), user.id)
+    if user.profile_picture != previous_picture:
+        release_picture(previous_picture)
     return jsonify({"message": "Profile updated", "profile_picture": user.profile_picture}), 200
+
+@profile_bp.route('/api/profile/picture', methods=['POST'])
+@login_required
+def upload_profile_picture(user):
+    """Multipart upload (field `picture`), streamed to disk in chunks and stored by content hash."""
+    max_length = MEDIA_STORE.max_bytes + MULTIPART_OVERHEAD
+    if request.content_length is not None and request.content_length > max_length:
+        return jsonify({"message": f"Image must be at most {MEDIA_STORE.max_bytes // 1024} KB"}), 413
+    writers = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        writer = MEDIA_STORE.open_temp()
+        writers.append(writer)
+        return writer
+
+    try:
+        _, _, files = parse_form_data(request.environ, stream_factory=stream_factory, max_content_length=max_length, silent=False)
+        upload = files.get('picture')
+        if upload is None:
+            return jsonify({"message": "No picture uploaded (multipart field 'picture')"}), 400
+        writers.remove(upload.stream)
+        filename = MEDIA_STORE.store(upload.stream)
+    except (ImageTooLarge, RequestEntityTooLarge):
+        return jsonify({"message": f"Image must be at most {MEDIA_STORE.max_bytes // 1024} KB"}), 413
+    except UnsupportedImage as e:
+        return jsonify({"message": str(e)}), 415
+    except ValueError:
+        return jsonify({"message": "Malformed multipart body"}), 400
+    finally:
+        for writer in writers:
+            MEDIA_STORE.discard(writer)
+
+    previous_picture, user.profile_picture = user.profile_picture, filename
+    db.session.commit()
+    invalidate_principal(type(user), user.id)
+    if filename != previous_picture:
+        release_picture(previous_picture)
+    return jsonify({"message": "Profile picture updated", "profile_picture": filename, "profile_thumbnail": MEDIA_STORE.thumbnail_for(filename)}), 200
@@ -0,0 +1,187 @@
+"""
+Build and serve fingerprinted, precompressed frontend assets.
+
+    python backend/static_assets.py            # frontend/ -> frontend/dist/
+
+CSS/JS under frontend/css and frontend/js are copied to content-hashed
+names (css/global.3f2a9c1b7d.css) and the HTML pages are rewritten to
+reference them. Every output gets .gz (and, with the optional brotli
+package, .br) siblings, and dist/manifest.json lists them for the server.
+"""
+import os
+import re
+import sys
+import json
+import gzip
+import time
+import hashlib
+import argparse
+import mimetypes
+import logging
+import threading
+
+try:
+    import brotli  # optional dependency, only needed for .br variants
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+ASSET_DIRS = ('css', 'js')
+# Skip precompressing files too small to benefit
+MIN_COMPRESS_BYTES = 256
+# Fingerprinted names change with content, so they can be cached forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+_ASSET_REF_RE = re.compile(r'''(\b(?:href|src)\s*=\s*["'])(?:\./)?((?:css|js)/[^"'?#]+)''')
+
+
+def content_hash(data, length=10):
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_variants(out_dir, rel_path, data):
+    """Write the file plus its compressed variants; returns {encoding: etag} including 'identity'."""
+    target = os.path.join(out_dir, rel_path)
+    _write(target, data)
+    etags = {'identity': content_hash(data, 16)}
+    if len(data) < MIN_COMPRESS_BYTES:
+        return etags
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    for encoding, payload in variants.items():
+        # Only keep a variant that is actually smaller
+        if len(payload) < len(data):
+            _write(target + ENCODING_SUFFIXES[encoding], payload)
+            etags[encoding] = f"{etags['identity']}-{encoding}"
+    return etags
+
+
+def build_assets(frontend_dir, out_dir=None):
+    """Fingerprint css/js, rewrite the HTML pages and write dist/manifest.json; returns the manifest."""
+    out_dir = out_dir or os.path.join(frontend_dir, 'dist')
+    renames, files = {}, {}
+
+    for asset_dir in ASSET_DIRS:
+        for root, _, names in os.walk(os.path.join(frontend_dir, asset_dir)):
+            for name in sorted(names):
+                source = os.path.join(root, name)
+                rel = os.path.relpath(source, frontend_dir).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    data = f.read()
+                stem, ext = os.path.splitext(rel)
+                fingerprinted = f"{stem}.{content_hash(data)}{ext}"
+                renames[rel] = fingerprinted
+                files[fingerprinted] = {'source': rel, 'immutable': True, 'etags': _write_variants(out_dir, fingerprinted, data)}
+
+    for name in sorted(os.listdir(frontend_dir)):
+        if not name.endswith('.html'):
+            continue
+        with open(os.path.join(frontend_dir, name), encoding='utf-8') as f:
+            html = f.read()
+        html = _ASSET_REF_RE.sub(lambda m: m.group(1) + renames.get(m.group(2), m.group(2)), html)
+        # HTML keeps its name, so it is revalidated by ETag instead of cached forever
+        files[name] = {'source': name, 'immutable': False, 'etags': _write_variants(out_dir, name, html.encode('utf-8'))}
+
+    manifest = {'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'assets': renames, 'files': files}
+    _write(os.path.join(out_dir, MANIFEST_FILE), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    # Drop outputs of earlier builds that the new manifest no longer references
+    keep = {MANIFEST_FILE} | {rel + suffix for rel in files for suffix in ('', *ENCODING_SUFFIXES.values())}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), out_dir).replace(os.sep, '/')
+            if rel not in keep:
+                os.remove(os.path.join(root, name))
+    return manifest
+
+
+class AssetIndex:
+    """Reads dist/manifest.json (reloaded when it changes) and resolves request paths to built files."""
+
+    def __init__(self, dist_dir, source_dir=None):
+        self.dist_dir = dist_dir
+        self.source_dir = source_dir or os.path.dirname(dist_dir)
+        self._key = None
+        self._files = {}
+        self._sources = ()
+        self._stale_warned = None
+        self._lock = threading.Lock()
+
+    def _current(self):
+        path = os.path.join(self.dist_dir, MANIFEST_FILE)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return {}
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    with open(path) as f:
+                        self._files = json.load(f).get('files', {})
+                    self._sources = tuple(os.path.join(self.source_dir, entry['source']) for entry in self._files.values() if entry['immutable'])
+                    self._key = key
+        return self._files
+
+    def _is_stale(self, entry):
+        """True when a page or any css/js source was edited after the last build."""
+        built = self._key[0]
+        for source in (os.path.join(self.source_dir, entry['source']), *self._sources):
+            try:
+                if os.stat(source).st_mtime_ns > built:
+                    if self._stale_warned != self._key:
+                        self._stale_warned = self._key
+                        logger.warning(f"⚠️ {source} changed since the last asset build, serving sources (re-run backend/static_assets.py)")
+                    return True
+            except FileNotFoundError:
+                pass
+        return False
+
+    def lookup(self, filename, accept_encodings):
+        """
+        (path, mimetype, content_encoding, etag, immutable) for the best
+        variant of a built file, or None when it is not part of the build
+        (or is a page whose sources changed since).
+        accept_encodings is werkzeug's request.accept_encodings.
+        """
+        entry = self._current().get(filename)
+        # Fingerprinted files are correct for their name forever; pages fall back to the sources after an edit
+        if entry is None or (not entry['immutable'] and self._is_stale(entry)):
+            return None
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        path = os.path.join(self.dist_dir, filename)
+        for encoding in ('br', 'gzip'):
+            if encoding in entry['etags'] and accept_encodings[encoding] > 0:
+                return path + ENCODING_SUFFIXES[encoding], mimetype, encoding, entry['etags'][encoding], entry['immutable']
+        return path, mimetype, None, entry['etags']['identity'], entry['immutable']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress frontend assets')
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument('--frontend', default=os.path.join(base, 'frontend'))
+    parser.add_argument('--out', default=None, help='output directory (default: <frontend>/dist)')
+    args = parser.parse_args()
+
+    manifest = build_assets(args.frontend, args.out)
+    for rel, info in sorted(manifest['files'].items()):
+        print(f"  {rel:40s} {', '.join(sorted(info['etags']))}")
+    if brotli is None:
+        print("⚠️ brotli not installed, wrote gzip variants only", file=sys.stderr)
+    print(f"✅ {len(manifest['files'])} files built into {args.out or os.path.join(args.frontend, 'dist')}")
+
+
+if __name__ == '__main__':
+    main()
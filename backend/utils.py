@@ -5,13 +5,21 @@ import secrets
 import string
 from functools import wraps
 from flask import request, jsonify, current_app
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 
 try:
     from .extensions import db
     from .models import User, Admin
+    from .cache import TTLCache
 except (ImportError, ValueError):
     from extensions import db
     from models import User, Admin
+    from cache import TTLCache
+
+# Per-process cache of authenticated principals, keyed by (model name, id); set by the app
+PRINCIPAL_CACHE = TTLCache(maxsize=10000, ttl=30)
 
 def sanitize_input(text, max_length=1000):
     if text is None:
@@ -55,6 +63,35 @@ def token_from_request():
             token = parts[1]
     return token
 
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+def load_principal(model, principal_id):
+    """
+    db.session.get() backed by PRINCIPAL_CACHE. A cached column snapshot is
+    re-attached to the session without a SELECT, so routes can still modify
+    and commit the returned object.
+    """
+    if principal_id is None:
+        return None
+    key = (model.__name__, principal_id)
+    snapshot = PRINCIPAL_CACHE.get(key) if PRINCIPAL_CACHE is not None else None
+    if snapshot is None:
+        obj = db.session.get(model, principal_id)
+        if obj is not None and PRINCIPAL_CACHE is not None:
+            PRINCIPAL_CACHE.set(key, _snapshot(obj))
+        return obj
+    obj = model.__mapper__.class_manager.new_instance()
+    for name, value in snapshot.items():
+        set_committed_value(obj, name, value)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+def invalidate_principal(model, principal_id):
+    """Drop a cached principal; call whenever the row is updated or deleted."""
+    if PRINCIPAL_CACHE is not None:
+        PRINCIPAL_CACHE.delete((model.__name__, principal_id))
+
 def login_required(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
@@ -63,7 +100,7 @@ def login_required(f):
             return jsonify({"message": "Token missing"}), 401
         try:
             decoded = decode_token(token)
-            user = db.session.get(User, decoded.get('user_id'))
+            user = load_principal(User, decoded.get('user_id'))
             if not user:
                 return jsonify({"message": "User not found"}), 401
         except jwt.ExpiredSignatureError:
@@ -86,7 +123,7 @@ def admin_required(f):
             decoded = decode_token(token)
             if decoded.get('role') != 'admin':
                 return jsonify({"message": "Admin role required"}), 403
-            admin = Admin.query.get(decoded.get('admin_id'))
+            admin = load_principal(Admin, decoded.get('admin_id'))
             if not admin:
                 return jsonify({"message": "Admin not found"}), 401
         except jwt.ExpiredSignatureError:
@@ -0,0 +1,110 @@
+"""
+Edu2Job - TF-IDF vs Hashing Text Features
+=========================================
+Trains the production model configuration on the same splits with the
+vocabulary-based TF-IDF text features and with HashingTfidfVectorizer,
+and reports accuracy, fit and transform speed, and the size of the fitted
+text-feature state.
+
+Usage:
+    python ml/compare_text_features.py [--data backend/models/JobRole.csv]
+        [--hash-dims 256:64 1024:256] [--seeds 5] [--batch-rows 100000]
+"""
+
+import os
+import time
+import pickle
+import logging
+import warnings
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+from preprocess import Edu2JobPreprocessor
+
+
+def make_model(seed):
+    """Same settings as the tuned model in backend/models/best_model.pkl."""
+    return LogisticRegression(C=1, solver='liblinear', max_iter=1000, random_state=seed)
+
+
+def evaluate(df, config, seed, batch_rows):
+    """
+    Fit, train and score one configuration on one split.
+
+    Args:
+        df: Full labelled DataFrame
+        config: Keyword arguments for Edu2JobPreprocessor
+        seed: Split and model seed
+        batch_rows: Rows in the transform throughput batch
+
+    Returns:
+        Dict of metrics
+    """
+    train, test = train_test_split(df, test_size=0.2, random_state=seed, stratify=df['Job Role'])
+    preprocessor = Edu2JobPreprocessor(**config)
+
+    started = time.perf_counter()
+    X_train, y_train = preprocessor.fit_transform(train, sparse=True)
+    fit_seconds = time.perf_counter() - started
+
+    model = make_model(seed)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - started
+
+    X_test = preprocessor.transform(test.drop(columns=['Job Role']), sparse=True)
+    y_test = preprocessor.label_encoders['Job Role'].transform(test['Job Role'])
+    probs = model.predict_proba(X_test)
+    top3 = np.argsort(probs, axis=1)[:, -3:]
+
+    batch = test.drop(columns=['Job Role']).sample(batch_rows, replace=True, random_state=seed).reset_index(drop=True)
+    started = time.perf_counter()
+    preprocessor.transform(batch, sparse=True)
+    transform_seconds = time.perf_counter() - started
+
+    return {
+        'features': X_train.shape[1],
+        'accuracy': float((model.classes_[probs.argmax(axis=1)] == y_test).mean()),
+        'top3': float(np.mean([label in row for label, row in zip(y_test, model.classes_[top3])])),
+        'fit_s': fit_seconds,
+        'train_s': train_seconds,
+        'rows_per_s': batch_rows / transform_seconds,
+        'state_kib': len(pickle.dumps((preprocessor.skills_vectorizer, preprocessor.cert_vectorizer))) / 1024,
+    }
+
+
+def main():
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Compare TF-IDF and hashing text features')
+    parser.add_argument('--data', default=os.path.join(base, 'backend', 'models', 'JobRole.csv'))
+    parser.add_argument('--hash-dims', nargs='+', default=['256:64', '1024:256'], help='skills:certification columns per hashing run')
+    parser.add_argument('--seeds', type=int, default=5)
+    parser.add_argument('--batch-rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # The production model uses liblinear one-vs-rest; its multiclass deprecation notice is noise here
+    warnings.filterwarnings('ignore', category=FutureWarning, module='sklearn')
+    df = pd.read_csv(args.data)
+
+    configs = [('tfidf', {'text_features': 'tfidf'})]
+    for dims in args.hash_dims:
+        skills, cert = (int(n) for n in dims.split(':'))
+        configs.append((f'hashing {skills}:{cert}', {'text_features': 'hashing', 'skills_hash_features': skills, 'cert_hash_features': cert}))
+
+    print(f"📊 {len(df)} rows, {args.seeds} stratified 80/20 splits, transform batch of {args.batch_rows} rows")
+    print(f"{'mode':18s} {'features':>8s} {'accuracy':>9s} {'top-3':>7s} {'fit s':>7s} {'train s':>8s} {'rows/s':>9s} {'state KiB':>10s}")
+    for name, config in configs:
+        runs = pd.DataFrame([evaluate(df, config, seed, args.batch_rows) for seed in range(args.seeds)])
+        mean = runs.mean()
+        print(f"{name:18s} {int(mean['features']):8d} {mean['accuracy']:9.4f} {mean['top3']:7.4f} {mean['fit_s']:7.2f} "
+              f"{mean['train_s']:8.2f} {mean['rows_per_s']:9.0f} {mean['state_kib']:10.1f}"
+              f"   (accuracy sd {runs['accuracy'].std():.4f})")
+
+
+if __name__ == '__main__':
+    main()
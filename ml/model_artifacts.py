@@ -0,0 +1,357 @@
+"""
+Edu2Job - Pickle-free Model Artifacts
+=====================================
+Exports a fitted (model, preprocessor) pair as a JSON manifest plus .npy
+arrays, and loads it back with read-only memory maps so every worker
+process shares one copy of the pages. Loading never unpickles anything.
+
+Layout of an artifact directory:
+    manifest.json          - format version, model info, preprocessor config
+    <name>-<digest>.npy    - coefficients, intercepts, classes, TF-IDF terms
+                             and IDF weights (document frequencies for
+                             hashing vectorizers), encoder classes, scaler stats
+
+Array files are content-addressed and the manifest is replaced last, so a
+re-export never rewrites a file another process has mapped.
+
+Usage:
+    python ml/model_artifacts.py --out backend/models/artifacts [--float32]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from preprocess import Edu2JobPreprocessor, HashingTfidfVectorizer, _WORDNET
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+FORMAT_NAME = 'edu2job-artifacts'
+FORMAT_VERSION = 1
+
+# JSON-serializable preprocessor attributes copied verbatim into the manifest
+PREPROCESSOR_STATE_KEYS = (
+    'skill_categories', 'role_keywords', 'categorical_cols', 'numerical_cols',
+    'text_cols', 'lemma_table', 'unseen_category_code', 'imputation_values', 'text_features'
+)
+
+# TfidfVectorizer parameters needed to rebuild the analyzer
+VECTORIZER_PARAMS = (
+    'analyzer', 'binary', 'lowercase', 'max_df', 'max_features', 'min_df', 'ngram_range',
+    'norm', 'smooth_idf', 'stop_words', 'strip_accents', 'sublinear_tf', 'token_pattern', 'use_idf'
+)
+
+# HashingTfidfVectorizer constructor parameters
+HASHING_VECTORIZER_PARAMS = ('n_features', 'ngram_range', 'stop_words', 'norm', 'smooth_idf', 'sublinear_tf', 'binary')
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class LinearClassifier:
+    """
+    predict_proba-compatible stand-in for a fitted LogisticRegression,
+    backed by (possibly memory-mapped) coefficient arrays.
+    """
+
+    def __init__(self, coef, intercept, classes, multi_class='ovr'):
+        """
+        Args:
+            coef: (n_classes, n_features) or (1, n_features) for binary models
+            intercept: (n_classes,) or (1,)
+            classes: Array of class labels, as model.classes_
+            multi_class: 'ovr' (one-vs-rest, e.g. liblinear) or 'multinomial'
+        """
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = classes
+        self.multi_class = multi_class
+        self.n_features_in_ = coef.shape[1]
+
+    def decision_function(self, X):
+        # CSR input (transform(..., sparse=True)) is multiplied as-is, without densifying
+        X = X.astype(self.coef_.dtype) if sparse.issparse(X) else np.asarray(X, dtype=self.coef_.dtype)
+        scores = X @ self.coef_.T + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X):
+        """Class probabilities, computed the same way as LogisticRegression.predict_proba."""
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            if self.multi_class == 'multinomial':
+                scores = np.column_stack([-scores, scores])
+            else:
+                positive = _expit(scores)
+                return np.column_stack([1 - positive, positive])
+        if self.multi_class == 'multinomial':
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        else:
+            scores = _expit(scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _multi_class(model):
+    """Resolve how LogisticRegression.predict_proba combines class scores for this model."""
+    setting = getattr(model, 'multi_class', 'auto')
+    if setting == 'ovr':
+        return 'ovr'
+    if setting == 'multinomial':
+        return 'multinomial'
+    # 'auto' / 'deprecated' / 'warn': liblinear and binary problems are one-vs-rest
+    if getattr(model, 'solver', 'lbfgs') == 'liblinear' or len(model.classes_) <= 2:
+        return 'ovr'
+    return 'multinomial'
+
+
+class _ArrayWriter:
+    """Saves arrays as content-addressed .npy files and records them for the manifest."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.arrays = {}
+
+    def save(self, name, array, dtype=None):
+        array = np.ascontiguousarray(array, dtype=dtype)
+        if array.dtype == object:
+            array = np.asarray(array.tolist(), dtype=str)
+        digest = hashlib.sha256(array.dtype.str.encode() + str(array.shape).encode() + array.tobytes()).hexdigest()[:16]
+        filename = f"{name}-{digest}.npy"
+        path = os.path.join(self.out_dir, filename)
+        if not os.path.exists(path):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(tmp_path, path)
+        self.arrays[filename] = {'shape': list(array.shape), 'dtype': array.dtype.str}
+        return filename
+
+
+def export_artifacts(model, preprocessor, out_dir, info=None, float32=False):
+    """
+    Write a fitted model and preprocessor as a manifest plus .npy arrays.
+
+    Args:
+        model: Fitted LogisticRegression (or any linear model with coef_,
+            intercept_ and classes_)
+        preprocessor: Fitted Edu2JobPreprocessor
+        out_dir: Target directory (created if missing)
+        info: Optional model_info dict stored in the manifest
+        float32: Store coefficients as float32 (half the size and matmul cost)
+
+    Returns:
+        Path to the written manifest
+    """
+    if not preprocessor.is_fitted:
+        raise ValueError("Cannot export an unfitted preprocessor")
+    os.makedirs(out_dir, exist_ok=True)
+    writer = _ArrayWriter(out_dir)
+    weight_dtype = np.float32 if float32 else np.float64
+
+    model_entry = {
+        'type': type(model).__name__,
+        'multi_class': _multi_class(model),
+        'coef': writer.save('coef', model.coef_, weight_dtype),
+        'intercept': writer.save('intercept', np.atleast_1d(model.intercept_), weight_dtype),
+        'classes': writer.save('classes', model.classes_),
+    }
+
+    scaler = preprocessor.scaler
+    vectorizers = {}
+    for attr in ('skills_vectorizer', 'cert_vectorizer'):
+        vectorizer = getattr(preprocessor, attr)
+        if isinstance(vectorizer, HashingTfidfVectorizer):
+            vectorizers[attr] = {
+                'kind': 'hashing',
+                'params': {key: getattr(vectorizer, key) for key in HASHING_VECTORIZER_PARAMS},
+                'doc_freq': writer.save(f'{attr}-doc-freq', vectorizer.doc_freq_, np.int64),
+                'n_docs': int(vectorizer.n_docs_),
+            }
+            continue
+        terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        params = {key: getattr(vectorizer, key) for key in VECTORIZER_PARAMS}
+        vectorizers[attr] = {
+            'params': params,
+            'terms': writer.save(f'{attr}-terms', np.asarray(terms, dtype=str)),
+            'idf': writer.save(f'{attr}-idf', vectorizer.idf_, np.float64) if vectorizer.use_idf else None,
+        }
+
+    preprocessor_entry = {
+        'state': {key: getattr(preprocessor, key) for key in PREPROCESSOR_STATE_KEYS},
+        'stop_words': sorted(preprocessor.stop_words),
+        'lemmatizer': _WORDNET if preprocessor.lemmatizer is not None else None,
+        'label_encoders': {col: writer.save(f'encoder-{i}', le.classes_) for i, (col, le) in enumerate(preprocessor.label_encoders.items())},
+        'scaler': {
+            'with_mean': scaler.with_mean,
+            'with_std': scaler.with_std,
+            'n_samples_seen': int(np.max(scaler.n_samples_seen_)),
+            'mean': writer.save('scaler-mean', scaler.mean_, np.float64),
+            'scale': writer.save('scaler-scale', scaler.scale_, np.float64),
+            'var': writer.save('scaler-var', scaler.var_, np.float64),
+            'feature_names': [str(name) for name in scaler.feature_names_in_] if hasattr(scaler, 'feature_names_in_') else None,
+        },
+        'vectorizers': vectorizers,
+    }
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'weight_dtype': np.dtype(weight_dtype).name,
+        'info': {k: v for k, v in (info or {}).items() if k != 'feature_names'},
+        'feature_names': preprocessor.get_feature_names(),
+        'model': model_entry,
+        'preprocessor': preprocessor_entry,
+        'arrays': writer.arrays,
+    }
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as f:
+            previous_arrays = set(json.load(f).get('arrays', {}))
+    except (OSError, ValueError):
+        previous_arrays = set()
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    # A process may have read the previous manifest but not loaded its arrays yet, so that
+    # generation is kept until the next export; only older arrays are removed
+    keep = set(writer.arrays) | previous_arrays
+    for filename in os.listdir(out_dir):
+        if filename.endswith('.npy') and filename not in keep:
+            os.remove(os.path.join(out_dir, filename))
+
+    logger.info(f"💾 Model artifacts exported to {out_dir} ({len(writer.arrays)} arrays, {manifest['weight_dtype']})")
+    return manifest_path
+
+
+def read_manifest(artifact_dir):
+    """Load and check the manifest of an artifact directory."""
+    with open(os.path.join(artifact_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME or manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format in {artifact_dir}")
+    return manifest
+
+
+def load_artifacts(artifact_dir, mmap=True):
+    """
+    Load an exported model and preprocessor without unpickling.
+
+    Args:
+        artifact_dir: Directory written by export_artifacts
+        mmap: Memory-map arrays read-only instead of reading them into the heap
+
+    Returns:
+        Tuple of (LinearClassifier, Edu2JobPreprocessor, info dict)
+    """
+    manifest = read_manifest(artifact_dir)
+    mmap_mode = 'r' if mmap else None
+
+    def array(filename):
+        loaded = np.load(os.path.join(artifact_dir, filename), mmap_mode=mmap_mode, allow_pickle=False)
+        expected = manifest['arrays'][filename]
+        if list(loaded.shape) != expected['shape'] or loaded.dtype.str != expected['dtype']:
+            raise ValueError(f"Artifact {filename} does not match the manifest")
+        return loaded
+
+    model_entry = manifest['model']
+    model = LinearClassifier(array(model_entry['coef']), array(model_entry['intercept']), array(model_entry['classes']), model_entry['multi_class'])
+
+    entry = manifest['preprocessor']
+    label_encoders = {}
+    for col, filename in entry['label_encoders'].items():
+        le = LabelEncoder()
+        le.classes_ = array(filename)
+        label_encoders[col] = le
+
+    scaler_entry = entry['scaler']
+    scaler = StandardScaler(with_mean=scaler_entry['with_mean'], with_std=scaler_entry['with_std'])
+    scaler.mean_ = array(scaler_entry['mean'])
+    scaler.scale_ = array(scaler_entry['scale'])
+    scaler.var_ = array(scaler_entry['var'])
+    scaler.n_features_in_ = len(scaler.mean_)
+    if scaler_entry.get('feature_names') is not None:
+        scaler.feature_names_in_ = np.asarray(scaler_entry['feature_names'], dtype=object)
+    scaler.n_samples_seen_ = scaler_entry['n_samples_seen']
+
+    state = dict(entry['state'])
+    for attr, spec in entry['vectorizers'].items():
+        params = dict(spec['params'])
+        params['ngram_range'] = tuple(params['ngram_range'])
+        if spec.get('kind') == 'hashing':
+            vectorizer = HashingTfidfVectorizer(**params)
+            vectorizer.doc_freq_ = array(spec['doc_freq'])
+            vectorizer.n_docs_ = spec['n_docs']
+            state[attr] = vectorizer
+            continue
+        terms = array(spec['terms']).tolist()
+        vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(terms)}, **params)
+        if spec['idf'] is not None:
+            vectorizer.idf_ = array(spec['idf'])
+        state[attr] = vectorizer
+
+    state.update(
+        label_encoders=label_encoders,
+        scaler=scaler,
+        stop_words=set(entry['stop_words']),
+        lemmatizer=entry['lemmatizer'],
+        is_fitted=True,
+    )
+    # Same restore path as unpickling: compiles the keyword index and category tables
+    preprocessor = Edu2JobPreprocessor.__new__(Edu2JobPreprocessor)
+    preprocessor.__setstate__(state)
+
+    if preprocessor.get_feature_names() != manifest['feature_names']:
+        raise ValueError("Artifact feature layout does not match the preprocessor configuration")
+    logger.info(f"📂 Model artifacts loaded from {artifact_dir} ({'mmap' if mmap else 'in-memory'})")
+    return model, preprocessor, manifest['info']
+
+
+if __name__ == '__main__':
+    import joblib
+    import __main__
+
+    logging.basicConfig(level=logging.INFO)
+    # Pickles reference the class as __main__.Edu2JobPreprocessor
+    __main__.Edu2JobPreprocessor = Edu2JobPreprocessor
+
+    model_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend', 'models')
+    parser = argparse.ArgumentParser(description='Export best_model.pkl and preprocessor.pkl as pickle-free artifacts')
+    parser.add_argument('--model', default=os.path.join(model_dir, 'best_model.pkl'))
+    parser.add_argument('--preprocessor', default=os.path.join(model_dir, 'preprocessor.pkl'))
+    parser.add_argument('--info', default=os.path.join(model_dir, 'model_info.json'))
+    parser.add_argument('--out', default=os.path.join(model_dir, 'artifacts'))
+    parser.add_argument('--float32', action='store_true', help='store coefficients as float32')
+    args = parser.parse_args()
+
+    info = {}
+    if os.path.exists(args.info):
+        with open(args.info) as f:
+            info = json.load(f)
+    model = joblib.load(args.model)
+    preprocessor = joblib.load(args.preprocessor)
+    manifest_path = export_artifacts(model, preprocessor, args.out, info=info, float32=args.float32)
+
+    # Round-trip check: the loaded artifacts must reproduce the pickled model
+    loaded_model, loaded_preprocessor, _ = load_artifacts(args.out)
+    sample = preprocessor.compile_inference_plan(model)
+    check = loaded_preprocessor.compile_inference_plan(loaded_model)
+    record = {'Degree': 'B.Tech', 'Major': 'Computer Science', 'Specialization': 'Machine Learning', 'CGPA': 8.5, 'Skills': 'Python, Machine Learning, SQL', 'Certification': 'AWS Certified', 'Years of Experience': 2, 'Preferred Industry': 'Tech'}
+    diff = np.abs(sample.predict_proba(record) - check.predict_proba(record)).max()
+    print(f"✅ Exported {manifest_path} (max probability difference {diff:.2e})")
+    sys.exit(0 if diff < (1e-4 if args.float32 else 1e-9) else 1)
@@ -8,75 +8,367 @@ Author: ML Pipeline Generator
 Date: 2025
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import pandas as pd
+import numpy as np
 import re
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.feature_extraction.text import TfidfVectorizer
+import math
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from scipy.sparse import vstack as sparse_vstack
+from sklearn.preprocessing import LabelEncoder, StandardScaler, normalize
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.utils import murmurhash3_32
 import joblib
 import logging
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
 import ssl
 import os
-import certifi
-
-# Fix for SSL certificate verify failed error on Mac
-# This is a common issue where Python doesn't have access to system certificates
-try:
-    # Option 1: Use certifi's certificate bundle (Best practice)
-    os.environ['SSL_CERT_FILE'] = certifi.where()
-    ssl._create_default_https_context = ssl.create_default_context
-except Exception:
-    # Option 2: Fallback to unverified context (Works if certifi fails)
-    try:
-        _create_unverified_https_context = ssl._create_unverified_context
-    except AttributeError:
-        pass
-    else:
-        ssl._create_default_https_context = _create_unverified_https_context
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    try:
-        nltk.download('punkt', quiet=True)
-    except:
-        print("⚠️  Could not download NLTK punkt data")
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
+# NLTK is imported and its corpora located (or downloaded) lazily, on first use.
+# Set EDU2JOB_NLTK_OFFLINE=1 to never touch the network: missing corpora fall back
+# to the built-in stopword list and to the lemma table saved with the preprocessor.
+NLTK_OFFLINE = os.getenv('EDU2JOB_NLTK_OFFLINE', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+_FALLBACK_STOP_WORDS = frozenset(['i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma', 'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't", 'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn', "wouldn't"])
+
+_nltk_resources = {}
+_stop_words = None
+_lemmatizer = None
+_ssl_configured = False
+
+# Marker stored in place of a WordNetLemmatizer; resolved by get_lemmatizer() on first use
+_WORDNET = 'wordnet'
+
+
+def _configure_ssl():
+    """
+    Fix for SSL certificate verify failed error on Mac, applied only right
+    before an NLTK download instead of at import time.
+    """
+    global _ssl_configured
+    if _ssl_configured:
+        return
+    _ssl_configured = True
     try:
-        nltk.download('wordnet', quiet=True)
-    except:
-        print("⚠️  Could not download NLTK wordnet data")
+        # Option 1: Use certifi's certificate bundle (Best practice)
+        import certifi
+        os.environ['SSL_CERT_FILE'] = certifi.where()
+        ssl._create_default_https_context = ssl.create_default_context
+    except Exception:
+        # Option 2: Fallback to unverified context (Works if certifi fails)
+        try:
+            _create_unverified_https_context = ssl._create_unverified_context
+        except AttributeError:
+            pass
+        else:
+            ssl._create_default_https_context = _create_unverified_https_context
+
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
+def ensure_nltk_resource(resource, package):
+    """
+    Locate an NLTK resource, downloading it unless running offline.
+    The outcome is remembered so each resource is resolved at most once.
+
+    Args:
+        resource: nltk.data path, e.g. 'corpora/wordnet'
+        package: Download package name, e.g. 'wordnet'
+
+    Returns:
+        True if the resource is available locally
+    """
+    if resource in _nltk_resources:
+        return _nltk_resources[resource]
+    available = False
     try:
-        nltk.download('stopwords', quiet=True)
-    except:
-        print("⚠️  Could not download NLTK stopwords data")
-
-# Initialize NLTK components with fallbacks
-try:
-    stop_words = set(stopwords.words('english'))
-except:
-    stop_words = set(['i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', "that'll", 'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma', 'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't", 'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn', "wouldn't"])
-
-lemmatizer = None
-try:
-    lemmatizer = WordNetLemmatizer()
-except Exception as e:
-    print(f"⚠️  Could not initialize WordNetLemmatizer: {e}")
-    lemmatizer = None
+        import nltk
+        try:
+            nltk.data.find(resource)
+            available = True
+        except LookupError:
+            if not NLTK_OFFLINE:
+                _configure_ssl()
+                available = bool(nltk.download(package, quiet=True))
+    except Exception as e:
+        logger.warning(f"⚠️  Could not load NLTK {package} data: {e}")
+    if not available:
+        logger.warning(f"⚠️  NLTK {package} data unavailable{' (offline mode)' if NLTK_OFFLINE else ''}")
+    _nltk_resources[resource] = available
+    return available
+
+
+def get_stop_words():
+    """NLTK English stopwords, or the built-in list when the corpus is unavailable."""
+    global _stop_words
+    if _stop_words is None:
+        words = _FALLBACK_STOP_WORDS
+        if ensure_nltk_resource('corpora/stopwords', 'stopwords'):
+            try:
+                from nltk.corpus import stopwords
+                words = stopwords.words('english')
+            except Exception as e:
+                logger.warning(f"⚠️  Could not read NLTK stopwords: {e}")
+        _stop_words = set(words)
+    return _stop_words
+
+
+def get_lemmatizer():
+    """Shared WordNetLemmatizer, or None when WordNet is unavailable."""
+    global _lemmatizer
+    if _lemmatizer is None and ensure_nltk_resource('corpora/wordnet', 'wordnet'):
+        try:
+            from nltk.stem import WordNetLemmatizer
+            _lemmatizer = WordNetLemmatizer()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not initialize WordNetLemmatizer: {e}")
+    return _lemmatizer
+
+
+def __getattr__(name):
+    """Module-level `stop_words` and `lemmatizer` are resolved lazily."""
+    if name == 'stop_words':
+        return get_stop_words()
+    if name == 'lemmatizer':
+        return get_lemmatizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters stripped by clean_text (everything but letters, digits, whitespace, ',' and '.')
+_NON_TEXT_RE = re.compile(r'[^a-z0-9\s,\.]')
+
+# Upper bound on the runtime token -> lemma memo (tokens outside the saved lemma table)
+LEMMA_MEMO_SIZE = 50000
+
+
+def _weighted_quantile(values, weights, q):
+    """
+    Quantile of a weighted sample, interpolated linearly like
+    pandas.Series.quantile on the expanded values.
+
+    Args:
+        values: Distinct values
+        weights: Occurrence count of each value
+        q: Quantile in [0, 1]
+
+    Returns:
+        float, or NaN for an empty sample
+    """
+    order = np.argsort(values, kind='stable')
+    values = np.asarray(values, dtype=np.float64)[order]
+    ends = np.cumsum(np.asarray(weights, dtype=np.int64)[order])
+    if not len(ends) or ends[-1] == 0:
+        return np.nan
+    h = (ends[-1] - 1) * q
+    lo, hi = np.searchsorted(ends, [math.floor(h), math.ceil(h)], side='right')
+    return float(values[lo] + (h - math.floor(h)) * (values[hi] - values[lo]))
+
+
+def _round2(values):
+    """np.round(values, 2) that agrees with Python's round() on half-way cases."""
+    rounded = np.round(values, 2)
+    with np.errstate(invalid='ignore'):
+        scaled = values * 100.0
+        ambiguous = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ambiguous:
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+# Fitted preprocessor of a transform_parallel worker process, set once by its initializer
+_worker_preprocessor = None
+
+
+def _init_transform_worker(preprocessor):
+    global _worker_preprocessor
+    _worker_preprocessor = preprocessor
+
+
+def _transform_chunk(chunk, sparse_output):
+    return _worker_preprocessor.transform(chunk, vectorized=True, sparse=sparse_output)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword list.
+
+    A single left-to-right pass over a text reports every keyword that occurs
+    anywhere in it as a substring (the `keyword in text` semantics used by the
+    feature extractors), so matching cost grows with the text length rather
+    than with text length times keyword count.
+    """
+
+    def __init__(self, keywords):
+        """
+        Compile the automaton.
+
+        Args:
+            keywords: List of keywords; match results are indices into this list
+        """
+        self.keywords = list(keywords)
+        goto = [{}]
+        outputs = [set()]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].add(keyword_id)
+
+        # Breadth-first pass: failure links, merged outputs and a full transition
+        # table so that matching never has to follow failure links.
+        fail = [0] * len(goto)
+        transitions = [dict(goto[0])]
+        transitions.extend({} for _ in range(len(goto) - 1))
+        queue = list(goto[0].values())
+        for state in queue:
+            parent_fail_transitions = transitions[fail[state]]
+            outputs[state] |= outputs[fail[state]]
+            row = dict(parent_fail_transitions)
+            for ch, child in goto[state].items():
+                fail[child] = parent_fail_transitions.get(ch, 0)
+                row[ch] = child
+                queue.append(child)
+            transitions[state] = row
+
+        self._transitions = transitions
+        self._outputs = [frozenset(out) for out in outputs]
+
+    def scan(self, text, state=0, found=None):
+        """
+        Feed text through the automaton.
+
+        Scanning can be resumed from a returned state, which lets callers read
+        matches for a prefix and for the whole text in one pass.
+
+        Args:
+            text: Lowercased input text
+            state: Automaton state to start from
+            found: Set of keyword indices to extend
+
+        Returns:
+            Tuple of (final state, set of matched keyword indices)
+        """
+        if found is None:
+            found = set()
+        transitions = self._transitions
+        outputs = self._outputs
+        for ch in text:
+            state = transitions[state].get(ch, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return state, found
+
+    def find(self, text):
+        """Return the set of keyword indices occurring in text."""
+        return self.scan(text)[1]
+
+
+def _hashed_index(term, n_features):
+    """Column of a term in HashingVectorizer's output (same murmurhash and modulo as FeatureHasher)."""
+    h = murmurhash3_32(term, seed=0)
+    if h == -2147483648:
+        return (2147483647 - (n_features - 1)) % n_features
+    return abs(h) % n_features
+
+
+class _HashedVocabulary:
+    """dict.get-style term -> column lookup standing in for vocabulary_ in InferencePlan."""
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+
+    def get(self, term, default=None):
+        return _hashed_index(term, self.n_features)
+
+    def __len__(self):
+        return self.n_features
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF over a fixed number of hashed n-gram columns.
+
+    Drop-in for the preprocessor's TfidfVectorizers without a vocabulary: a
+    term's column is the murmurhash of its text (as HashingVectorizer), so
+    the fitted state is one document-frequency array of n_features ints
+    whatever the corpus size, and partial_fit can learn the IDF weights one
+    chunk at a time. transform follows TfidfVectorizer's counts -> IDF ->
+    norm steps. Unlike max_features, rare terms are not dropped; colliding
+    terms share a column.
+    """
+
+    def __init__(self, n_features=256, ngram_range=(1, 2), stop_words='english',
+                 norm='l2', smooth_idf=True, sublinear_tf=False, binary=False):
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = stop_words
+        self.norm = norm
+        self.smooth_idf = smooth_idf
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.use_idf = True
+        self.hasher = HashingVectorizer(
+            n_features=self.n_features, ngram_range=self.ngram_range, stop_words=stop_words,
+            binary=binary, alternate_sign=False, norm=None
+        )
+        self.reset()
+
+    def reset(self):
+        """Forget the document frequencies learned so far."""
+        self.doc_freq_ = np.zeros(self.n_features, dtype=np.int64)
+        self.n_docs_ = 0
+
+    def build_analyzer(self):
+        return self.hasher.build_analyzer()
+
+    def get_feature_names_out(self):
+        return np.array([f'hash_{i}' for i in range(self.n_features)], dtype=object)
+
+    @property
+    def idf_(self):
+        smooth = int(self.smooth_idf)
+        return np.log((self.n_docs_ + smooth) / (self.doc_freq_ + smooth).astype(np.float64)) + 1
+
+    def partial_fit(self, texts):
+        """Add the document frequencies of a batch of cleaned texts, hashing each distinct text once."""
+        codes, uniques = pd.factorize(np.asarray(texts, dtype=object))
+        counts = self.hasher.transform(uniques)
+        occurrences = np.bincount(codes, minlength=len(uniques))
+        # Hashed rows have one entry per column, so weighted column counts are document frequencies
+        weights = np.repeat(occurrences, np.diff(counts.indptr)).astype(np.float64)
+        self.doc_freq_ += np.bincount(counts.indices, weights=weights, minlength=self.n_features).astype(np.int64)
+        self.n_docs_ += len(codes)
+        return self
+
+    def fit(self, texts):
+        self.reset()
+        return self.partial_fit(texts)
+
+    def transform(self, texts):
+        """
+        Args:
+            texts: Iterable of cleaned texts
+
+        Returns:
+            (len(texts), n_features) float64 CSR matrix
+        """
+        X = self.hasher.transform(texts)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        X.data *= self.idf_[X.indices]
+        if self.norm:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
 
 class Edu2JobPreprocessor:
     """
@@ -84,24 +376,46 @@ class Edu2JobPreprocessor:
     Handles missing values, outliers, text cleaning, encoding, and scaling.
     """
     
-    def __init__(self):
-        """Initialize preprocessing components"""
+    def __init__(self, text_features='tfidf', skills_hash_features=256, cert_hash_features=64):
+        """
+        Initialize preprocessing components
+        
+        Args:
+            text_features: 'tfidf' (learned vocabularies of 100 skill and 50
+                certification n-grams) or 'hashing' (HashingTfidfVectorizer
+                with a fixed number of columns and no vocabulary)
+            skills_hash_features: Skills columns in 'hashing' mode
+            cert_hash_features: Certification columns in 'hashing' mode
+        """
+        if text_features not in ('tfidf', 'hashing'):
+            raise ValueError(f"text_features must be 'tfidf' or 'hashing', got {text_features!r}")
+        self.text_features = text_features
         self.label_encoders = {}
         self.scaler = StandardScaler()
-        self.skills_vectorizer = TfidfVectorizer(
-            max_features=100,  # Increased from 50
-            ngram_range=(1, 2),
-            min_df=2,
-            stop_words='english'
-        )
-        self.cert_vectorizer = TfidfVectorizer(
-            max_features=50,
-            ngram_range=(1, 2),
-            min_df=2,
-            stop_words='english'
-        )
-        self.lemmatizer = lemmatizer
-        self.stop_words = stop_words
+        if text_features == 'hashing':
+            self.skills_vectorizer = HashingTfidfVectorizer(n_features=skills_hash_features)
+            self.cert_vectorizer = HashingTfidfVectorizer(n_features=cert_hash_features)
+        else:
+            self.skills_vectorizer = TfidfVectorizer(
+                max_features=100,  # Increased from 50
+                ngram_range=(1, 2),
+                min_df=2,
+                stop_words='english'
+            )
+            self.cert_vectorizer = TfidfVectorizer(
+                max_features=50,
+                ngram_range=(1, 2),
+                min_df=2,
+                stop_words='english'
+            )
+        self.lemmatizer = _WORDNET
+        self.stop_words = get_stop_words()
+        self.lemma_table = {}
+        self._lemma_memo = {}
+        # Code used for categorical values not seen at fit time (0 = first class, as LabelEncoder ordering)
+        self.unseen_category_code = 0
+        # Training medians/modes that fill missing values at transform time (None until fitted)
+        self.imputation_values = None
         self.is_fitted = False
         
         # Enhanced skill categorization with role-specific distinctions
@@ -251,6 +565,105 @@ class Edu2JobPreprocessor:
         self.text_cols = ['Skills', 'Certification']
         
         logger.info("✅ Preprocessor initialized")
+
+    def __getstate__(self):
+        """
+        Pickle without the compiled keyword index, category tables or lemma
+        memo; the lookup structures are rebuilt on load. The lemmatizer is stored as a marker so loading a
+        saved preprocessor does not import NLTK.
+        """
+        state = self.__dict__.copy()
+        state.pop('keyword_index', None)
+        state.pop('category_tables', None)
+        state.pop('_lemma_memo', None)
+        if state.get('lemmatizer') is not None:
+            state['lemmatizer'] = _WORDNET
+        return state
+
+    def __setstate__(self, state):
+        """Restore pickled state and compile the keyword matcher and category tables once at load time."""
+        self.__dict__.update(state)
+        self.__dict__.setdefault('lemma_table', {})
+        self.__dict__.setdefault('unseen_category_code', 0)
+        self.__dict__.setdefault('imputation_values', None)
+        self.__dict__.setdefault('text_features', 'tfidf')
+        self._lemma_memo = {}
+        if self.__dict__.get('is_fitted'):
+            self.build_keyword_index()
+            self.build_category_tables()
+
+    def lemmatize_token(self, token):
+        """
+        Lemma for a single token, checking the saved lemma table, then the
+        bounded runtime memo, and only then WordNet.
+
+        Args:
+            token: Lowercased token
+
+        Returns:
+            Lemmatized token (the token itself if lemmatization fails)
+        """
+        lemma = self.lemma_table.get(token)
+        if lemma is not None:
+            return lemma
+        memo = self._lemma_memo
+        lemma = memo.get(token)
+        if lemma is not None:
+            return lemma
+        lemma = token
+        if isinstance(self.lemmatizer, str):
+            self.lemmatizer = get_lemmatizer()
+        if self.lemmatizer is not None:
+            try:
+                lemma = self.lemmatizer.lemmatize(token)
+            except LookupError:
+                # WordNet missing (e.g. older pickle on an offline host): stop retrying on every token
+                logger.warning("⚠️  WordNet unavailable, lemmatization disabled")
+                self.lemmatizer = None
+            except Exception:
+                lemma = token
+        if len(memo) >= LEMMA_MEMO_SIZE:
+            del memo[next(iter(memo))]
+        memo[token] = lemma
+        return lemma
+
+    def _unique_text_tokens(self, series):
+        """
+        Distinct raw text values of a column and their filtered tokens.
+
+        Returns:
+            Tuple of (codes, uniques, tokens) where tokens is indexed by the
+            position of its text in uniques
+        """
+        codes, uniques = pd.factorize(series)
+        texts = pd.Series(uniques, dtype=object).astype(str).str.lower()
+        texts = texts.str.replace(_NON_TEXT_RE, ' ', regex=True)
+
+        tokens = texts.str.split().explode()
+        tokens = tokens[tokens.notna()]
+        tokens = tokens[(tokens.str.len() > 2) & ~tokens.isin(self.stop_words)]
+        return codes, uniques, tokens
+
+    def build_lemma_table(self, columns):
+        """
+        Precompute lemmas for every token in the given text columns.
+
+        The table is saved with the preprocessor, so cleaning text seen at
+        fit time is a dictionary lookup and never reaches WordNet.
+
+        Args:
+            columns: Iterable of pandas Series of raw text values
+
+        Returns:
+            Number of entries in the lemma table
+        """
+        for series in columns:
+            _, _, tokens = self._unique_text_tokens(series)
+            for token in tokens.unique():
+                if token not in self.lemma_table:
+                    self.lemma_table[token] = self.lemmatize_token(token)
+        logger.info(f"  ✓ Lemma table: {len(self.lemma_table)} tokens")
+        return len(self.lemma_table)
     
     def clean_text(self, text):
         """
@@ -265,28 +678,38 @@ class Edu2JobPreprocessor:
         if pd.isna(text) or text is None:
             return ''
         
-        text = str(text).lower()
         # Remove special characters but keep spaces and common punctuation
-        text = re.sub(r'[^a-z0-9\s,\.]', ' ', text)
-        # Remove extra whitespace
-        text = ' '.join(text.split())
+        text = _NON_TEXT_RE.sub(' ', str(text).lower())
         
         # Tokenize and lemmatize
-        tokens = text.split()
-        lemmatized_tokens = []
-        for token in tokens:
-            if token not in self.stop_words and len(token) > 2:
-                if self.lemmatizer:
-                    try:
-                        lemma = self.lemmatizer.lemmatize(token)
-                    except:
-                        lemma = token
-                else:
-                    lemma = token
-                lemmatized_tokens.append(lemma)
-        
-        return ' '.join(lemmatized_tokens)
-    
+        stop_words = self.stop_words
+        lemmatize = self.lemmatize_token
+        return ' '.join(lemmatize(token) for token in text.split() if len(token) > 2 and token not in stop_words)
+
+    def clean_text_column(self, series):
+        """
+        Vectorized clean_text over a whole column.
+
+        Each distinct raw value is cleaned once with column-wise string ops;
+        tokens are lemmatized once per distinct token.
+
+        Args:
+            series: pandas Series of raw text values
+
+        Returns:
+            Series of cleaned strings aligned with the input index
+        """
+        codes, uniques, tokens = self._unique_text_tokens(series)
+
+        if len(tokens):
+            tokens = tokens.map({token: self.lemmatize_token(token) for token in tokens.unique()})
+
+        cleaned = tokens.groupby(level=0, sort=False).agg(' '.join)
+        cleaned = cleaned.reindex(range(len(uniques)), fill_value='').to_numpy(dtype=object)
+        # Missing values are factorized to -1, which picks the trailing ''
+        cleaned = np.append(cleaned, '')
+        return pd.Series(cleaned[codes], index=series.index, dtype=object)
+
     def categorize_skills(self, skills_text):
         """
         Categorize skills into predefined categories.
@@ -297,20 +720,10 @@ class Edu2JobPreprocessor:
         Returns:
             Dictionary of skill category counts
         """
-        if not skills_text:
-            return {cat: 0 for cat in self.skill_categories.keys()}
-        
-        skills_lower = skills_text.lower()
-        category_counts = {}
-        
-        for category, keywords in self.skill_categories.items():
-            count = 0
-            for keyword in keywords:
-                if keyword in skills_lower:
-                    count += 1
-            category_counts[category] = count
-        
-        return category_counts
+        keyword_index = self._get_keyword_index()
+        matched = keyword_index['matcher'].find(skills_text.lower()) if skills_text else set()
+        counts = self._category_counts(matched)
+        return dict(zip(keyword_index['category_names'], counts.tolist()))
     
     def extract_role_features(self, skills_text, cert_text):
         """
@@ -323,28 +736,222 @@ class Edu2JobPreprocessor:
         Returns:
             Dictionary of role-specific feature scores
         """
+        keyword_index = self._get_keyword_index()
         combined_text = f"{skills_text} {cert_text}".lower()
-        role_features = {}
-        
-        for role, keyword_config in self.role_keywords.items():
+        scores = self._role_scores(keyword_index['matcher'].find(combined_text))
+        return dict(zip(keyword_index['role_feature_names'], scores.tolist()))
+
+    def keyword_features(self, skills_text, cert_text):
+        """
+        Skill category counts and role scores from a single pass over the text.
+
+        The skills part is scanned first; the automaton state is then carried
+        over " " + cert_text, so the category counts (skills only) and role
+        scores (skills + certification) come out of the same scan.
+
+        Args:
+            skills_text: Cleaned skills text
+            cert_text: Cleaned certification text
+
+        Returns:
+            Tuple of (int64 category counts, float64 role scores) arrays
+        """
+        matcher = self._get_keyword_index()['matcher']
+        state, matched = matcher.scan(skills_text.lower())
+        skills_matched = set(matched)
+        matcher.scan(f" {cert_text}".lower(), state, matched)
+        return self._category_counts(skills_matched), self._role_scores(matched)
+
+    def _category_counts(self, keyword_ids):
+        """Skill category counts for a set of matched keyword indices."""
+        category_dense = self._get_keyword_index()['category_dense']
+        if not keyword_ids:
+            return np.zeros(category_dense.shape[1], dtype=np.int64)
+        return category_dense[list(keyword_ids)].sum(axis=0)
+
+    def _role_scores(self, keyword_ids):
+        """Normalized role scores for a set of matched keyword indices."""
+        keyword_index = self._get_keyword_index()
+        role_dense = keyword_index['role_dense']
+        if not keyword_ids:
+            return np.zeros(role_dense.shape[1], dtype=np.float64)
+        return self._normalize_role_scores(role_dense[list(keyword_ids)].sum(axis=0))
+
+    def _normalize_role_scores(self, raw_scores):
+        """Apply role weights and caps to raw (high + 0.5 * medium) match scores."""
+        keyword_index = self._get_keyword_index()
+        max_scores = keyword_index['role_max_scores']
+        # Same arithmetic as the original per-keyword loop: (high + medium) * weight / max_possible
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = (raw_scores * keyword_index['role_weights']) / max_scores
+        scores[..., max_scores <= 0] = 0.0
+        return np.minimum(scores, 1.0)
+
+    def build_keyword_index(self):
+        """
+        Compile skill_categories and role_keywords into a keyword matcher and
+        keyword -> feature matrices.
+
+        Every distinct keyword gets one index in the KeywordMatcher automaton.
+        Summing the `category_matrix` rows of the matched keywords gives the
+        categorize_skills counts, and summing the `role_matrix` rows gives the raw
+        (high + 0.5 * medium) role scores.
+
+        Returns:
+            Dictionary holding the keyword list and the compiled matrices
+        """
+        keywords = []
+        keyword_ids = {}
+
+        def keyword_id(keyword):
+            if keyword not in keyword_ids:
+                keyword_ids[keyword] = len(keywords)
+                keywords.append(keyword)
+            return keyword_ids[keyword]
+
+        # Keyword -> skill category counts
+        cat_rows, cat_cols = [], []
+        for col, (category, category_keywords) in enumerate(self.skill_categories.items()):
+            for keyword in category_keywords:
+                cat_rows.append(keyword_id(keyword))
+                cat_cols.append(col)
+
+        # Keyword -> role score (1.0 for high priority, 0.5 for medium priority)
+        role_rows, role_cols, role_vals = [], [], []
+        role_weights, role_max_scores = [], []
+        for col, (role, keyword_config) in enumerate(self.role_keywords.items()):
             high_priority = keyword_config['high_priority']
             medium_priority = keyword_config.get('medium_priority', [])
             weight = keyword_config.get('weight', 1.0)
-            
-            # Calculate score based on keyword matches
-            high_score = sum(1 for keyword in high_priority if keyword in combined_text)
-            medium_score = sum(0.5 for keyword in medium_priority if keyword in combined_text)
-            
-            total_score = (high_score + medium_score) * weight
-            
-            # Normalize by maximum possible score for this role
-            max_possible = (len(high_priority) + len(medium_priority) * 0.5) * weight
-            normalized_score = total_score / max_possible if max_possible > 0 else 0
-            
-            role_features[f"{role.lower().replace(' ', '_')}_score"] = min(normalized_score, 1.0)  # Cap at 1.0
-        
-        return role_features
-    
+            for keyword in high_priority:
+                role_rows.append(keyword_id(keyword))
+                role_cols.append(col)
+                role_vals.append(1.0)
+            for keyword in medium_priority:
+                role_rows.append(keyword_id(keyword))
+                role_cols.append(col)
+                role_vals.append(0.5)
+            role_weights.append(weight)
+            role_max_scores.append((len(high_priority) + len(medium_priority) * 0.5) * weight)
+
+        n_keywords = len(keywords)
+        # COO -> CSR sums duplicate entries, matching keywords listed twice in the dicts
+        category_matrix = sparse.coo_matrix(
+            (np.ones(len(cat_rows), dtype=np.int64), (cat_rows, cat_cols)),
+            shape=(n_keywords, len(self.skill_categories))
+        ).tocsr()
+        role_matrix = sparse.coo_matrix(
+            (np.asarray(role_vals, dtype=np.float64), (role_rows, role_cols)),
+            shape=(n_keywords, len(self.role_keywords))
+        ).tocsr()
+
+        self.keyword_index = {
+            'keywords': keywords,
+            'matcher': KeywordMatcher(keywords),
+            'category_matrix': category_matrix,
+            'role_matrix': role_matrix,
+            'category_dense': category_matrix.toarray(),
+            'role_dense': role_matrix.toarray(),
+            'role_weights': np.asarray(role_weights, dtype=np.float64),
+            'role_max_scores': np.asarray(role_max_scores, dtype=np.float64),
+            'category_names': list(self.skill_categories.keys()),
+            'role_feature_names': [f"{role.lower().replace(' ', '_')}_score" for role in self.role_keywords.keys()]
+        }
+        return self.keyword_index
+
+    def build_category_tables(self):
+        """
+        Compile each fitted LabelEncoder into a value -> code dict, so encoding
+        is one hash lookup per value instead of scanning classes_.
+
+        Returns:
+            Dict of column name -> {value: code}
+        """
+        self.category_tables = {
+            col: {value: code for code, value in enumerate(self.label_encoders[col].classes_.tolist())}
+            for col in self.categorical_cols
+            if col in self.label_encoders
+        }
+        return self.category_tables
+
+    def _get_category_tables(self):
+        """Return the compiled category tables, building them if missing."""
+        category_tables = getattr(self, 'category_tables', None)
+        if category_tables is None:
+            category_tables = self.build_category_tables()
+        return category_tables
+
+    def _get_keyword_index(self):
+        """Return the compiled keyword index, building it for preprocessors pickled before it existed."""
+        keyword_index = getattr(self, 'keyword_index', None)
+        if keyword_index is None:
+            keyword_index = self.build_keyword_index()
+        return keyword_index
+
+    def _keyword_incidence(self, keyword_id_sets):
+        """
+        Build a binary text x keyword incidence matrix from matcher results.
+
+        Args:
+            keyword_id_sets: One set of matched keyword indices per text
+
+        Returns:
+            CSR matrix of shape (len(keyword_id_sets), n_keywords)
+        """
+        n_keywords = len(self._get_keyword_index()['keywords'])
+        indptr = np.zeros(len(keyword_id_sets) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in keyword_id_sets], out=indptr[1:])
+        indices = np.fromiter(
+            (keyword_id for ids in keyword_id_sets for keyword_id in sorted(ids)),
+            dtype=np.int64, count=int(indptr[-1])
+        )
+        return sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int64), indices, indptr),
+            shape=(len(keyword_id_sets), n_keywords)
+        )
+
+    def keyword_features_batch(self, skills_texts, cert_texts=None):
+        """
+        Vectorized keyword_features over many rows.
+
+        Each distinct (skills, certification) pair is scanned once; the matches
+        are turned into sparse incidence matrices and multiplied by the compiled
+        keyword -> category and keyword -> role matrices.
+
+        Args:
+            skills_texts: Sequence of cleaned skills texts
+            cert_texts: Sequence of cleaned certification texts, or None to
+                compute category counts only
+
+        Returns:
+            Tuple of (int64 category counts, float64 role scores or None) arrays
+        """
+        keyword_index = self._get_keyword_index()
+        matcher = keyword_index['matcher']
+        skills_codes, skills_uniques = pd.factorize(np.asarray(skills_texts, dtype=object))
+        
+        if cert_texts is None:
+            skills_matched = [matcher.find(text.lower()) for text in skills_uniques]
+            category_counts = (self._keyword_incidence(skills_matched) @ keyword_index['category_matrix']).toarray()
+            return category_counts[skills_codes], None
+        
+        cert_codes, cert_uniques = pd.factorize(np.asarray(cert_texts, dtype=object))
+        n_cert = len(cert_uniques)
+        pair_codes, pairs = pd.factorize(skills_codes.astype(np.int64) * n_cert + cert_codes)
+        
+        skills_matched, combined_matched = [], []
+        for pair in pairs:
+            skills_code, cert_code = divmod(int(pair), n_cert)
+            state, matched = matcher.scan(skills_uniques[skills_code].lower())
+            skills_matched.append(set(matched))
+            matcher.scan(f" {cert_uniques[cert_code]}".lower(), state, matched)
+            combined_matched.append(matched)
+        
+        category_counts = (self._keyword_incidence(skills_matched) @ keyword_index['category_matrix']).toarray()
+        raw_scores = (self._keyword_incidence(combined_matched).astype(np.float64) @ keyword_index['role_matrix']).toarray()
+        role_scores = self._normalize_role_scores(raw_scores)
+        return category_counts[pair_codes], role_scores[pair_codes]
+
     def normalize_cgpa(self, cgpa):
         """
         Normalize CGPA to 10-point scale.
@@ -382,17 +989,48 @@ class Edu2JobPreprocessor:
         except (ValueError, TypeError):
             logger.warning(f"Cannot convert CGPA: {cgpa}, using median 7.5")
             return 7.5
-    
-    def handle_missing_values(self, df):
+
+    def normalize_cgpa_column(self, series):
+        """
+        Vectorized normalize_cgpa over a whole column.
+
+        Args:
+            series: pandas Series of CGPA values
+
+        Returns:
+            float64 Series on a 10-point scale
+        """
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            normalized = np.select(
+                [(values > 0) & (values <= 4.5), (values > 4.5) & (values <= 10.0), values > 10],
+                [_round2(values / 4.0 * 10.0), _round2(values), np.minimum(_round2(values / 10.0), 10.0)],
+                default=7.5
+            )
+        invalid = int(((values <= 0) | np.isnan(values)).sum())
+        if invalid:
+            logger.warning(f"{invalid} invalid CGPA values, using median 7.5")
+        return pd.Series(normalized, index=series.index)
+
+    def handle_missing_values(self, df, fill_values=None):
         """
         Handle missing values intelligently for each column type.
         
+        Numerical and categorical gaps are filled with the medians / modes
+        learned at fit time, so a row is imputed the same way whatever batch
+        it arrives in. Only an unfitted preprocessor falls back to the
+        median / mode of df itself.
+        
         Args:
             df: Input DataFrame
+            fill_values: Optional {column: value} used instead of the fitted
+                statistics (e.g. statistics of a whole CSV read in chunks)
             
         Returns:
             DataFrame with missing values handled
         """
+        if fill_values is None:
+            fill_values = self._get_imputation_values()
         df = df.copy()
         
         # Handle Certification: 'None' for missing
@@ -405,21 +1043,54 @@ class Edu2JobPreprocessor:
             df['Specialization'] = df['Specialization'].fillna('General')
             df.loc[df['Specialization'].str.strip() == '', 'Specialization'] = 'General'
         
-        # Handle numerical: median imputation
-        for col in self.numerical_cols:
-            if col in df.columns:
-                median_val = df[col].median()
-                df[col] = df[col].fillna(median_val)
+        # Handle numerical and categorical: fitted median / mode, one fillna over all columns
+        fills = {col: value for col, value in fill_values.items() if col in df.columns}
+        if fills:
+            df = df.fillna(fills)
         
-        # Handle categorical: mode imputation
+        # Columns without a fitted statistic: median / mode of this frame
+        for col in self.numerical_cols:
+            if col in df.columns and col not in fills:
+                df[col] = df[col].fillna(df[col].median())
         for col in self.categorical_cols:
-            if col in df.columns and df[col].isna().any():
-                mode_val = df[col].mode()[0] if len(df[col].mode()) > 0 else 'Unknown'
-                df[col] = df[col].fillna(mode_val)
+            if col in df.columns and col not in fills and df[col].isna().any():
+                df[col] = df[col].fillna(self._column_mode(df[col]))
         
         logger.info("✅ Missing values handled")
         return df
     
+    @staticmethod
+    def _column_mode(series):
+        modes = series.mode()
+        return modes[0] if len(modes) > 0 else 'Unknown'
+    
+    def _imputation_statistics(self, df):
+        """Medians of the numerical and modes of the categorical columns of a raw training frame."""
+        values = {}
+        for col in self.numerical_cols:
+            if col in df.columns:
+                values[col] = float(pd.to_numeric(df[col], errors='coerce').median())
+        for col in self.categorical_cols:
+            if col in df.columns:
+                values[col] = self._column_mode(df[col])
+        return values
+    
+    def _get_imputation_values(self):
+        """
+        Fill values for handle_missing_values. Preprocessors saved before
+        the statistics were recorded fall back to the scaler's training
+        means and to 'Unknown' (the unseen-category code); an unfitted one
+        has none.
+        """
+        if self.imputation_values is not None:
+            return self.imputation_values
+        if not self.is_fitted:
+            return {}
+        values = {col: 'Unknown' for col in self.categorical_cols}
+        if hasattr(self.scaler, 'mean_'):
+            values.update(zip(self.numerical_cols, map(float, self.scaler.mean_)))
+        return values
+    
     def remove_outliers(self, df, columns=None):
         """
         Remove outliers using IQR method.
@@ -470,7 +1141,8 @@ class Edu2JobPreprocessor:
         
         df = df.copy()
         
-        # 1. Handle missing values
+        # 1. Handle missing values (the medians/modes are kept for transform)
+        self.imputation_values = self._imputation_statistics(df)
         df = self.handle_missing_values(df)
         
         # 2. Normalize CGPA
@@ -480,7 +1152,8 @@ class Edu2JobPreprocessor:
         # 3. Remove outliers
         df = self.remove_outliers(df)
         
-        # 4. Clean text columns
+        # 4. Clean text columns (lemmas are precomputed once and saved with the preprocessor)
+        self.build_lemma_table(df[col] for col in self.text_cols if col in df.columns)
         for col in self.text_cols:
             if col in df.columns:
                 df[col] = df[col].apply(self.clean_text)
@@ -514,26 +1187,245 @@ class Edu2JobPreprocessor:
             self.scaler.fit(df_encoded[self.numerical_cols])
             logger.info(f"  ✓ Scaler fitted on {self.numerical_cols}")
         
+        # 8. Compile keyword-incidence matrices and category lookup tables
+        self.build_keyword_index()
+        self.build_category_tables()
+        
         self.is_fitted = True
         logger.info("✅ Preprocessor fitting complete!")
         
         return df
     
-    def transform(self, df, is_training=False):
+    def fit_streaming(self, csv_path, chunksize=100000, sketch_decimals=6):
+        """
+        Fit preprocessor on a CSV too large for memory, reading it in chunks.
+
+        Produces the same fitted state as fit(pd.read_csv(csv_path)) within
+        floating point tolerance, in two passes:
+
+        1. Numerical and categorical columns only: a joint histogram of the
+           numerical values (rounded to sketch_decimals) and category counts.
+           Imputation medians/modes, CGPA normalization and the sequential
+           IQR outlier bounds of remove_outliers are computed exactly from
+           these sketches.
+        2. Full rows, outliers dropped: lemma table, encoder vocabularies,
+           scaler running statistics (StandardScaler.partial_fit) and TF-IDF
+           term and document frequencies.
+
+        Memory grows with the number of distinct numerical tuples, categories
+        and n-grams (constant for the n-grams in 'hashing' mode), not with
+        the number of rows. A 'Job Role' column, if
+        present, also gets its label encoder fitted here so that chunked
+        transform(..., is_training=True) calls share one target encoding.
+
+        Args:
+            csv_path: Path of the training CSV
+            chunksize: Rows per chunk
+            sketch_decimals: Decimals the numerical values are rounded to in
+                the pass 1 histogram
+
+        Returns:
+            Number of rows the preprocessor was fitted on (after outlier removal)
+        """
+        logger.info(f"🔧 Fitting preprocessor on {csv_path} in chunks of {chunksize}...")
+        
+        # Pass 1: numerical histogram and category counts
+        sketch_cols = set(self.numerical_cols) | set(self.categorical_cols)
+        num_cols, numeric_counts, category_counts = [], {}, {}
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, usecols=lambda c: c in sketch_cols):
+            num_cols = [col for col in self.numerical_cols if col in chunk.columns]
+            if num_cols:
+                counts = chunk[num_cols].apply(pd.to_numeric, errors='coerce').round(sketch_decimals).value_counts(dropna=False)
+                for key, count in counts.items():
+                    key = tuple(None if pd.isna(v) else float(v) for v in (key if isinstance(key, tuple) else (key,)))
+                    numeric_counts[key] = numeric_counts.get(key, 0) + int(count)
+            for col in self.categorical_cols:
+                if col in chunk.columns:
+                    col_counts = category_counts.setdefault(col, {})
+                    for value, count in chunk[col].value_counts().items():
+                        col_counts[value] = col_counts.get(value, 0) + int(count)
+        
+        fill_values, bounds = self._fit_numeric_sketch(num_cols, numeric_counts)
+        for col, col_counts in category_counts.items():
+            if col_counts:
+                # Series.mode() order: most frequent first, ties broken by sort order
+                top = max(col_counts.values())
+                fill_values[col] = sorted(value for value, count in col_counts.items() if count == top)[0]
+            else:
+                fill_values[col] = 'Unknown'
+        self.imputation_values = fill_values
+        
+        # Pass 2: rows that survive outlier removal
+        vocabularies = {}
+        text_stats = {col: ({}, {}) for col in self.text_cols}
+        for col in self.text_cols:
+            if isinstance(self._text_vectorizer(col), HashingTfidfVectorizer):
+                self._text_vectorizer(col).reset()
+        self.scaler = StandardScaler()
+        n_rows = n_seen = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            n_seen += len(chunk)
+            chunk = self.handle_missing_values(chunk, fill_values)
+            if 'CGPA' in chunk.columns:
+                chunk['CGPA'] = self.normalize_cgpa_column(chunk['CGPA'])
+            for col, (lower, upper) in bounds.items():
+                chunk = chunk[(chunk[col] >= lower) & (chunk[col] <= upper)]
+            if chunk.empty:
+                continue
+            n_rows += len(chunk)
+            
+            text_cols = [col for col in self.text_cols if col in chunk.columns]
+            self.build_lemma_table(chunk[col] for col in text_cols)
+            for col in text_cols:
+                vectorizer = self._text_vectorizer(col)
+                if isinstance(vectorizer, HashingTfidfVectorizer):
+                    vectorizer.partial_fit(self.clean_text_column(chunk[col]))
+                else:
+                    self._accumulate_term_stats(vectorizer, self.clean_text_column(chunk[col]), *text_stats[col])
+            
+            for col in self.categorical_cols + ['Job Role']:
+                if col in chunk.columns:
+                    vocabularies.setdefault(col, set()).update(chunk[col].unique())
+            
+            if all(col in chunk.columns for col in self.numerical_cols):
+                self.scaler.partial_fit(chunk[self.numerical_cols])
+        
+        if not n_rows:
+            raise ValueError(f"No training rows left in {csv_path} after outlier removal")
+        logger.info(f"✅ Removed {n_seen - n_rows} outliers ({(n_seen - n_rows)/n_seen*100:.1f}%)")
+        
+        for col, values in vocabularies.items():
+            le = LabelEncoder()
+            le.classes_ = np.array(sorted(values), dtype=object)
+            self.label_encoders[col] = le
+            if col != 'Job Role':
+                logger.info(f"  ✓ {col}: {len(le.classes_)} unique values")
+        
+        for col in self.text_cols:
+            vectorizer = self._text_vectorizer(col)
+            term_freqs, doc_freqs = text_stats[col]
+            if doc_freqs:
+                self._fit_vectorizer_from_stats(vectorizer, term_freqs, doc_freqs, n_rows)
+            if doc_freqs or getattr(vectorizer, 'n_docs_', 0):
+                logger.info(f"  ✓ {col} TF-IDF: {len(vectorizer.get_feature_names_out())} features")
+        if hasattr(self.scaler, 'mean_'):
+            logger.info(f"  ✓ Scaler fitted on {self.numerical_cols}")
+        
+        self.build_keyword_index()
+        self.build_category_tables()
+        
+        self.is_fitted = True
+        logger.info(f"✅ Preprocessor fitting complete! ({n_rows} rows)")
+        return n_rows
+    
+    def _fit_numeric_sketch(self, columns, counts):
+        """
+        Imputation medians and IQR outlier bounds from a joint histogram of
+        raw numerical values, replaying handle_missing_values,
+        normalize_cgpa and remove_outliers on the distinct tuples.
+
+        Args:
+            columns: Numerical columns, in the order of the histogram keys
+            counts: {(value or None, ...): row count}
+
+        Returns:
+            Tuple of ({column: median}, {column: (lower, upper)})
+        """
+        medians, bounds = {}, {}
+        if not counts:
+            return medians, bounds
+        keys = np.array([[np.nan if v is None else v for v in key] for key in counts], dtype=np.float64)
+        weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        
+        for j, col in enumerate(columns):
+            present = ~np.isnan(keys[:, j])
+            medians[col] = _weighted_quantile(keys[present, j], weights[present], 0.5)
+            keys[~present, j] = medians[col]
+            if col == 'CGPA':
+                keys[:, j] = [self.normalize_cgpa(v) for v in keys[:, j]]
+        
+        # remove_outliers filters column by column, so each column's quartiles only see rows kept so far
+        kept = np.ones(len(keys), dtype=bool)
+        for col in self.numerical_cols:
+            if col not in columns:
+                continue
+            j = columns.index(col)
+            q1 = _weighted_quantile(keys[kept, j], weights[kept], 0.25)
+            q3 = _weighted_quantile(keys[kept, j], weights[kept], 0.75)
+            bounds[col] = (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+            kept &= (keys[:, j] >= bounds[col][0]) & (keys[:, j] <= bounds[col][1])
+        return medians, bounds
+    
+    def _text_vectorizer(self, col):
+        return self.skills_vectorizer if col == 'Skills' else self.cert_vectorizer
+    
+    @staticmethod
+    def _accumulate_term_stats(vectorizer, texts, term_freqs, doc_freqs):
+        """Add the n-gram counts and document frequencies of texts, analyzing each distinct text once."""
+        analyze = vectorizer.build_analyzer()
+        codes, uniques = pd.factorize(texts)
+        for text, occurrences in zip(uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))):
+            occurrences = int(occurrences)
+            terms = {}
+            for term in analyze(text):
+                terms[term] = terms.get(term, 0) + 1
+            for term, count in terms.items():
+                term_freqs[term] = term_freqs.get(term, 0) + count * occurrences
+                doc_freqs[term] = doc_freqs.get(term, 0) + occurrences
+    
+    @staticmethod
+    def _fit_vectorizer_from_stats(vectorizer, term_freqs, doc_freqs, n_docs):
+        """
+        Set a TfidfVectorizer's vocabulary and IDF weights from accumulated
+        statistics, applying min_df/max_df/max_features the way
+        TfidfVectorizer.fit does (including its tie order).
+        """
+        terms = sorted(doc_freqs)
+        dfs = np.array([doc_freqs[term] for term in terms], dtype=np.int64)
+        tfs = np.array([term_freqs[term] for term in terms], dtype=np.float64)
+        high = vectorizer.max_df if isinstance(vectorizer.max_df, (int, np.integer)) else vectorizer.max_df * n_docs
+        low = vectorizer.min_df if isinstance(vectorizer.min_df, (int, np.integer)) else vectorizer.min_df * n_docs
+        mask = (dfs <= high) & (dfs >= low)
+        limit = vectorizer.max_features
+        if limit is not None and mask.sum() > limit:
+            top = np.where(mask)[0][(-tfs[mask]).argsort()[:limit]]
+            mask = np.zeros(len(terms), dtype=bool)
+            mask[top] = True
+        kept = np.where(mask)[0]
+        if not len(kept):
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        
+        vectorizer.vocabulary_ = {terms[i]: new for new, i in enumerate(kept)}
+        vectorizer.fixed_vocabulary_ = False
+        if vectorizer.use_idf:
+            smooth = int(vectorizer.smooth_idf)
+            vectorizer.idf_ = np.log((n_docs + smooth) / (dfs[kept] + smooth).astype(np.float64)) + 1
+            vectorizer._tfidf.n_features_in_ = len(kept)
+    
+    def transform(self, df, is_training=False, vectorized=False, sparse=False):
         """
         Transform data using fitted preprocessor.
         
         Args:
             df: Input DataFrame
             is_training: If True, includes target column and removes outliers
+            vectorized: If True, use the column-wise batch path (same output,
+                much faster on large frames)
+            sparse: If True, return a scipy CSR matrix with the same columns
+                as the DataFrame (see get_feature_names). The TF-IDF blocks
+                are never densified; implies vectorized
             
         Returns:
-            Transformed DataFrame ready for model
+            Transformed DataFrame (or CSR matrix) ready for model
         """
         if not self.is_fitted:
             raise ValueError("Preprocessor must be fitted before transform. Call fit() first.")
         
-        logger.info(f"🔄 Transforming data (training={is_training})...")
+        logger.info(f"🔄 Transforming data (training={is_training}, vectorized={vectorized}, sparse={sparse})...")
+        
+        if vectorized or sparse:
+            df, df_features = self._transform_vectorized(df, is_training, as_sparse=sparse)
+            return self._finalize_transform(df, df_features, is_training)
         
         df = df.copy()
         
@@ -554,17 +1446,7 @@ class Edu2JobPreprocessor:
                 df[col] = df[col].apply(self.clean_text)
         
         # 5. Transform categorical columns using label encoders
-        for col in self.categorical_cols:
-            if col in df.columns:
-                # Handle unseen categories by mapping to most common class
-                le = self.label_encoders[col]
-                most_common_class = le.classes_[0]
-                
-                # Map unseen values to most common
-                df[col] = df[col].apply(
-                    lambda x: x if x in le.classes_ else most_common_class
-                )
-                df[col] = le.transform(df[col])
+        df = self._encode_categoricals(df)
         
         # 6. Transform text columns using TF-IDF and extract additional features
         skills_features = None
@@ -581,9 +1463,10 @@ class Edu2JobPreprocessor:
                 index=df.index
             )
             
-            # Skill category features
-            skill_categories = df['Skills'].apply(self.categorize_skills)
-            skill_category_features = pd.DataFrame(list(skill_categories), index=df.index)
+            # Skill category features (computed with the role scores below when possible)
+            if 'Certification' not in df.columns:
+                skill_categories = df['Skills'].apply(self.categorize_skills)
+                skill_category_features = pd.DataFrame(list(skill_categories), index=df.index)
         
         if 'Certification' in df.columns:
             cert_tfidf = self.cert_vectorizer.transform(df['Certification'])
@@ -593,13 +1476,15 @@ class Edu2JobPreprocessor:
                 index=df.index
             )
         
-        # Role-specific features
+        # Skill category and role-specific features, one keyword scan per row
         if 'Skills' in df.columns and 'Certification' in df.columns:
-            role_scores = []
-            for idx, row in df.iterrows():
-                role_feat = self.extract_role_features(row['Skills'], row['Certification'])
-                role_scores.append(role_feat)
-            role_features = pd.DataFrame(role_scores, index=df.index)
+            keyword_index = self._get_keyword_index()
+            category_counts = np.zeros((len(df), len(keyword_index['category_names'])), dtype=np.int64)
+            role_scores = np.zeros((len(df), len(keyword_index['role_feature_names'])), dtype=np.float64)
+            for i, (skills_text, cert_text) in enumerate(zip(df['Skills'], df['Certification'])):
+                category_counts[i], role_scores[i] = self.keyword_features(skills_text, cert_text)
+            skill_category_features = pd.DataFrame(category_counts, columns=keyword_index['category_names'], index=df.index)
+            role_features = pd.DataFrame(role_scores, columns=keyword_index['role_feature_names'], index=df.index)
         
         # 7. Scale numerical features
         if all(col in df.columns for col in self.numerical_cols):
@@ -622,6 +1507,10 @@ class Edu2JobPreprocessor:
         if role_features is not None:
             df_features = pd.concat([df_features, role_features], axis=1)
         
+        return self._finalize_transform(df, df_features, is_training)
+
+    def _finalize_transform(self, df, df_features, is_training):
+        """Attach the encoded target when training and log the output shape."""
         # Keep target if training
         if is_training and 'Job Role' in df.columns:
             # Encode target
@@ -631,24 +1520,157 @@ class Edu2JobPreprocessor:
                 self.label_encoders['Job Role'] = le_target
             
             y = self.label_encoders['Job Role'].transform(df['Job Role'])
-            logger.info(f"✅ Transformed {len(df_features)} samples, {len(df_features.columns)} features")
+            logger.info(f"✅ Transformed {df_features.shape[0]} samples, {df_features.shape[1]} features")
             return df_features, y
         
-        logger.info(f"✅ Transformed {len(df_features)} samples, {len(df_features.columns)} features")
+        logger.info(f"✅ Transformed {df_features.shape[0]} samples, {df_features.shape[1]} features")
         return df_features
     
-    def fit_transform(self, df):
+    def _encode_categoricals(self, df):
+        """
+        Label-encode categorical columns in place, mapping unseen values to
+        unseen_category_code.
+
+        Args:
+            df: DataFrame with raw categorical columns
+
+        Returns:
+            DataFrame with encoded categorical columns
+        """
+        category_tables = self._get_category_tables()
+        for col in self.categorical_cols:
+            if col in df.columns:
+                # One hash lookup per value; unseen values come back as NaN
+                codes = df[col].map(category_tables[col])
+                df[col] = codes.fillna(self.unseen_category_code).astype(np.int64)
+        return df
+
+    def _transform_vectorized(self, df, is_training=False, as_sparse=False):
+        """
+        Column-wise implementation of transform for large batches.
+
+        Text columns are cleaned and featurized once per distinct value; skill
+        categories and role scores come from keyword_features_batch.
+
+        Args:
+            df: Input DataFrame
+            is_training: If True, removes outliers
+            as_sparse: If True, hstack the blocks into a CSR matrix instead of
+                concatenating DataFrames
+
+        Returns:
+            Tuple of (processed DataFrame, feature DataFrame or CSR matrix)
+        """
+        df = self.handle_missing_values(df)
+        
+        if 'CGPA' in df.columns:
+            df['CGPA'] = self.normalize_cgpa_column(df['CGPA'])
+        
+        if is_training:
+            df = self.remove_outliers(df)
+        
+        for col in self.text_cols:
+            if col in df.columns:
+                df[col] = self.clean_text_column(df[col])
+        
+        df = self._encode_categoricals(df)
+        
+        keyword_index = self._get_keyword_index()
+        blocks = []
+        
+        if all(col in df.columns for col in self.numerical_cols):
+            df[self.numerical_cols] = self.scaler.transform(df[self.numerical_cols])
+        base_cols = self.categorical_cols + self.numerical_cols
+        if as_sparse:
+            blocks.append(sparse.csr_matrix(df[base_cols].to_numpy(dtype=np.float64)))
+        else:
+            blocks.append(df[base_cols])
+        
+        if 'Skills' in df.columns:
+            skills_codes, skills_uniques = pd.factorize(df['Skills'])
+            skills_tfidf = self.skills_vectorizer.transform(skills_uniques)[skills_codes]
+            blocks.append(skills_tfidf if as_sparse else pd.DataFrame(
+                skills_tfidf.toarray(),
+                columns=[f'skill_{i}' for i in range(skills_tfidf.shape[1])],
+                index=df.index
+            ))
+        
+        if 'Certification' in df.columns:
+            cert_codes, cert_uniques = pd.factorize(df['Certification'])
+            cert_tfidf = self.cert_vectorizer.transform(cert_uniques)[cert_codes]
+            blocks.append(cert_tfidf if as_sparse else pd.DataFrame(
+                cert_tfidf.toarray(),
+                columns=[f'cert_{i}' for i in range(cert_tfidf.shape[1])],
+                index=df.index
+            ))
+        
+        if 'Skills' in df.columns:
+            cert_texts = df['Certification'] if 'Certification' in df.columns else None
+            if as_sparse:
+                # Converted as they are returned, so the dense arrays are freed before the hstack
+                blocks.extend(sparse.csr_matrix(block, dtype=np.float64)
+                              for block in self.keyword_features_batch(df['Skills'], cert_texts) if block is not None)
+            else:
+                category_counts, role_scores = self.keyword_features_batch(df['Skills'], cert_texts)
+                blocks.append(pd.DataFrame(category_counts, columns=keyword_index['category_names'], index=df.index))
+                if role_scores is not None:
+                    blocks.append(pd.DataFrame(role_scores, columns=keyword_index['role_feature_names'], index=df.index))
+        
+        if as_sparse:
+            return df, sparse.hstack(blocks, format='csr', dtype=np.float64)
+        return df, pd.concat(blocks, axis=1)
+
+    def transform_parallel(self, df, n_jobs=None, chunksize=50000, sparse=False):
+        """
+        Vectorized transform of a large frame on several processes.
+
+        The frame is split into row chunks that worker processes transform
+        concurrently; the fitted preprocessor is sent to each worker once,
+        by the pool initializer, rather than with every chunk. Results are
+        reassembled in input order and equal transform(df, vectorized=True).
+
+        Args:
+            df: Input DataFrame (inference only: outlier removal for
+                training needs quartiles of the whole frame)
+            n_jobs: Worker processes (default: one per CPU)
+            chunksize: Rows per chunk
+            sparse: If True, return one CSR matrix (see transform)
+
+        Returns:
+            Transformed DataFrame (or CSR matrix)
+        """
+        if not self.is_fitted:
+            raise ValueError("Preprocessor must be fitted before transform. Call fit() first.")
+        
+        n_jobs = n_jobs or os.cpu_count() or 1
+        chunksize = max(1, int(chunksize))
+        if n_jobs <= 1 or len(df) <= chunksize:
+            return self.transform(df, vectorized=True, sparse=sparse)
+        
+        chunks = [df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize)]
+        n_jobs = min(n_jobs, len(chunks))
+        logger.info(f"🔄 Transforming {len(df)} rows in {len(chunks)} chunks on {n_jobs} processes...")
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_transform_worker, initargs=(self,)) as executor:
+            # map() yields results in submission order, whichever worker finishes first
+            results = list(executor.map(_transform_chunk, chunks, [sparse] * len(chunks)))
+        
+        if sparse:
+            return sparse_vstack(results, format='csr')
+        return pd.concat(results)
+    
+    def fit_transform(self, df, sparse=False):
         """
         Fit and transform training data in one step.
         
         Args:
             df: Training DataFrame with target column
+            sparse: If True, X is a CSR matrix (see transform)
             
         Returns:
             Tuple of (X, y) - features and target
         """
         self.fit(df)
-        return self.transform(df, is_training=True)
+        return self.transform(df, is_training=True, sparse=sparse)
     
     def save(self, filepath='preprocessor.pkl'):
         """
@@ -701,6 +1723,254 @@ class Edu2JobPreprocessor:
         
         return feature_names
 
+    def compile_inference_plan(self, model=None):
+        """
+        Freeze this fitted preprocessor into a single-sample InferencePlan.
+
+        Args:
+            model: Optional fitted classifier the plan will call
+
+        Returns:
+            InferencePlan instance
+        """
+        if not self.is_fitted:
+            raise ValueError("Preprocessor must be fitted before compiling an inference plan")
+        return InferencePlan(self, model)
+
+
+def _is_missing(value):
+    """True for None and float NaN, the values pandas treats as missing in a record."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class InferencePlan:
+    """
+    Pandas-free, single-sample version of Edu2JobPreprocessor.transform.
+
+    Everything that does not depend on the input (encoder lookup tables,
+    scaler statistics, TF-IDF vocabularies and IDF weights, feature offsets,
+    class names) is extracted once from the fitted preprocessor. Transforming
+    a record then writes straight into a NumPy row vector with the same
+    column layout and values as transform().
+    """
+
+    def __init__(self, preprocessor, model=None):
+        """
+        Compile the plan.
+
+        Args:
+            preprocessor: Fitted Edu2JobPreprocessor
+            model: Optional fitted classifier with predict_proba
+        """
+        self.preprocessor = preprocessor
+        self.model = model
+        self.feature_names = preprocessor.get_feature_names()
+        self.n_features = len(self.feature_names)
+        self.categorical_cols = list(preprocessor.categorical_cols)
+        self.numerical_cols = list(preprocessor.numerical_cols)
+
+        # Categorical value -> code; unseen values map to unseen_category_code like transform()
+        self.category_codes = preprocessor._get_category_tables()
+        self.unseen_code = preprocessor.unseen_category_code
+        self.fill_values = dict(preprocessor._get_imputation_values())
+
+        scaler = preprocessor.scaler
+        n_numerical = len(self.numerical_cols)
+        self.scaler_mean = scaler.mean_ if getattr(scaler, 'with_mean', True) else np.zeros(n_numerical)
+        self.scaler_scale = scaler.scale_ if getattr(scaler, 'with_std', True) else np.ones(n_numerical)
+
+        offset = len(self.categorical_cols) + n_numerical
+        self.skills_tfidf = self._compile_tfidf(preprocessor.skills_vectorizer, offset)
+        offset += len(self.skills_tfidf['vocabulary'])
+        self.cert_tfidf = self._compile_tfidf(preprocessor.cert_vectorizer, offset)
+        offset += len(self.cert_tfidf['vocabulary'])
+        keyword_index = preprocessor._get_keyword_index()
+        self.category_offset = offset
+        self.role_offset = offset + len(keyword_index['category_names'])
+
+        target_encoder = preprocessor.label_encoders.get('Job Role')
+        self.class_names = np.asarray(target_encoder.classes_) if target_encoder is not None else None
+
+        # The plan guarantees column order, so the ndarray-vs-DataFrame warning is noise
+        self._silence_feature_names = model is not None and hasattr(model, 'feature_names_in_')
+
+    @staticmethod
+    def _compile_tfidf(vectorizer, offset):
+        """Extract what is needed to reproduce TfidfVectorizer.transform for one document."""
+        if isinstance(vectorizer, HashingTfidfVectorizer):
+            vocabulary = _HashedVocabulary(vectorizer.n_features)
+        else:
+            vocabulary = dict(vectorizer.vocabulary_)
+        return {
+            'offset': offset,
+            'analyzer': vectorizer.build_analyzer(),
+            'vocabulary': vocabulary,
+            'idf': np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf else None,
+            'binary': vectorizer.binary,
+            'sublinear_tf': vectorizer.sublinear_tf,
+            'norm': vectorizer.norm
+        }
+
+    @staticmethod
+    def _write_tfidf(tfidf, text, row):
+        """Write the TF-IDF vector of one document into row, in the same order of operations as sklearn."""
+        vocabulary = tfidf['vocabulary']
+        counts = {}
+        for term in tfidf['analyzer'](text):
+            index = vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        if not counts:
+            return
+        
+        indices = sorted(counts)
+        values = np.array([1.0 if tfidf['binary'] else counts[i] for i in indices], dtype=np.float64)
+        if tfidf['sublinear_tf']:
+            values = np.log(values) + 1.0
+        if tfidf['idf'] is not None:
+            values = values * tfidf['idf'][indices]
+        if tfidf['norm'] == 'l2':
+            total = 0.0
+            for value in values.tolist():
+                total += value * value
+            if total != 0.0:
+                values = values / math.sqrt(total)
+        elif tfidf['norm'] == 'l1':
+            total = 0.0
+            for value in values.tolist():
+                total += abs(value)
+            if total != 0.0:
+                values = values / total
+        row[tfidf['offset'] + np.asarray(indices)] = values
+
+    def transform_record(self, record, out=None):
+        """
+        Transform one raw input record.
+
+        Args:
+            record: Dict keyed by the raw column names (Degree, Major, Skills, ...)
+            out: Optional preallocated (1, n_features) float64 array to write into
+
+        Returns:
+            (1, n_features) float64 array
+        """
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float64)
+        else:
+            out.fill(0.0)
+        row = out[0]
+        preprocessor = self.preprocessor
+        
+        # Missing values, same defaults and fitted medians/modes as handle_missing_values
+        values = {}
+        for col, default in (('Certification', 'None'), ('Specialization', 'General')):
+            value = record.get(col)
+            if _is_missing(value) or (isinstance(value, str) and value.strip() == ''):
+                value = default
+            values[col] = value
+        
+        fill_values = self.fill_values
+        for i, col in enumerate(self.categorical_cols):
+            value = values[col] if col in values else record.get(col)
+            if _is_missing(value):
+                value = fill_values.get(col, 'Unknown')
+            row[i] = self.category_codes[col].get(value, self.unseen_code)
+        
+        numerical = []
+        for col in self.numerical_cols:
+            value = record.get(col)
+            if _is_missing(value):
+                value = fill_values.get(col, np.nan)
+            if col == 'CGPA':
+                numerical.append(preprocessor.normalize_cgpa(value))
+            else:
+                numerical.append(np.nan if _is_missing(value) else float(value))
+        start = len(self.categorical_cols)
+        row[start:start + len(numerical)] = (np.asarray(numerical, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+        
+        skills_text = preprocessor.clean_text(record.get('Skills'))
+        cert_text = preprocessor.clean_text(values['Certification'])
+        self._write_tfidf(self.skills_tfidf, skills_text, row)
+        self._write_tfidf(self.cert_tfidf, cert_text, row)
+        
+        category_counts, role_scores = preprocessor.keyword_features(skills_text, cert_text)
+        row[self.category_offset:self.category_offset + len(category_counts)] = category_counts
+        row[self.role_offset:self.role_offset + len(role_scores)] = role_scores
+        return out
+
+    def _predict_proba(self, X):
+        """Score a plan matrix, hiding the feature-names warning only for this call."""
+        if self.model is None:
+            raise ValueError("InferencePlan was compiled without a model")
+        if not self._silence_feature_names:
+            return self.model.predict_proba(X)
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names', category=UserWarning)
+            return self.model.predict_proba(X)
+
+    def predict_proba(self, record, out=None):
+        """
+        Transform one record and score it with the plan's model.
+
+        Args:
+            record: Dict keyed by the raw column names
+            out: Optional preallocated (1, n_features) row buffer
+
+        Returns:
+            1-D array of class probabilities
+        """
+        return self._predict_proba(self.transform_record(record, out))[0]
+
+    def transform_records(self, records, out=None):
+        """
+        Transform several records into the rows of one matrix.
+
+        Args:
+            records: Sequence of dicts keyed by the raw column names
+            out: Optional preallocated (len(records), n_features) buffer
+
+        Returns:
+            (len(records), n_features) float64 array
+        """
+        if out is None:
+            out = np.zeros((len(records), self.n_features), dtype=np.float64)
+        for i, record in enumerate(records):
+            self.transform_record(record, out[i:i + 1])
+        return out
+
+    def predict_proba_batch(self, records):
+        """
+        Transform records one by one but score them with a single
+        predict_proba call, amortizing the model's per-call overhead.
+
+        Args:
+            records: Sequence of dicts keyed by the raw column names
+
+        Returns:
+            (len(records), n_classes) array of class probabilities
+        """
+        return self._predict_proba(self.transform_records(records))
+
+    def top_k(self, probs, k=5):
+        """
+        Indices of the k most probable classes, best first.
+
+        Args:
+            probs: 1-D array of class probabilities
+            k: Number of classes to return
+
+        Returns:
+            Array of class indices
+        """
+        k = min(k, len(probs))
+        top = np.argpartition(probs, -k)[-k:]
+        return top[np.argsort(probs[top])[::-1]]
+
+
+# Wall time spent importing this module (no NLTK work happens at import)
+IMPORT_TIME_SECONDS = time.perf_counter() - _IMPORT_STARTED
+logger.info(f"⏱️  preprocess imported in {IMPORT_TIME_SECONDS * 1000:.0f} ms")
+
 
 if __name__ == '__main__':
     # Test preprocessing pipeline
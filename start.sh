@@ -66,7 +66,16 @@ else
     echo ""
 fi
 
-# Step 4: Check if port 8000 is already in use
+# Step 4: Build fingerprinted, precompressed frontend assets (served from frontend/dist)
+echo -e "${BLUE}🗜️  Building frontend assets...${NC}"
+if python3 backend/static_assets.py > /dev/null; then
+    echo -e "${GREEN}✓ Assets built into frontend/dist/${NC}"
+else
+    echo -e "${YELLOW}⚠️  Asset build failed, serving frontend/ sources directly${NC}"
+fi
+echo ""
+
+# Step 4b: Check if port 8000 is already in use
 echo -e "${BLUE}🔍 Checking port 8000...${NC}"
 if lsof -Pi :8000 -sTCP:LISTEN -t >/dev/null 2>&1 ; then
     echo -e "${YELLOW}⚠️  Port 8000 is already in use${NC}"